@@ -10,10 +10,13 @@ import traceback
 
 from nvidia_driver_setup.utils.logging import log_error, log_step, log_info, log_success
 from nvidia_driver_setup.utils.prompts import prompt_yes_no, prompt_multi_select
-from nvidia_driver_setup.utils.system import full_nvidia_cleanup, cleanup_nvidia_repos, detect_gpu_vendors
+from nvidia_driver_setup.utils.system import (
+    full_nvidia_cleanup, cleanup_nvidia_repos, detect_gpu_vendors, get_os_info,
+)
 from nvidia_driver_setup.system.checks import (
     run_preliminary_checks,
     detect_existing_installations,
+    invalidate_gpu_query_cache,
     get_system_info,
     display_system_info,
 )
@@ -275,10 +278,16 @@ def execute_selected_items(
     """
     actions = [action_ids[i] for i in selected]
     ordered = sorted(actions, key=lambda a: EXECUTION_ORDER.get(a, 99))
+    if ACTION_SELF_UPDATE in ordered:
+        # Self-update runs last; check for updates while the other items run
+        from nvidia_driver_setup.updater import prefetch_update_check
+        prefetch_update_check()
     total = len(ordered)
     for step, action in enumerate(ordered, 1):
         log_step(f"[{step}/{total}] Running: {action}")
         _execute_action(action, installations)
+        # A driver install/cleanup changes what nvidia-smi reports to later steps
+        invalidate_gpu_query_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -379,11 +388,12 @@ def main() -> None:
 
         # Gather and display system information first
         log_step("Gathering System Information")
-        system_info = get_system_info()
+        os_info = get_os_info()
+        system_info = get_system_info(os_info)
         display_system_info(system_info)
 
         # Run system checks (fast: GPU, OS, deps, internet)
-        run_preliminary_checks()
+        run_preliminary_checks(os_info)
 
         # Detect GPU vendors and existing installations
         gpu_vendors = detect_gpu_vendors()
@@ -416,7 +426,7 @@ def main() -> None:
             # Only refresh detection if status-changing items ran
             selected_actions = {action_ids[i] for i in selected}
             if _STATUS_CHANGING_ACTIONS.intersection(selected_actions):
-                installations = detect_existing_installations()
+                installations = detect_existing_installations(refresh=True)
 
             # Pause so user can read output before menu redraws
             print()
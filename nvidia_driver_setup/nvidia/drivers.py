@@ -6,7 +6,7 @@ import re
 import subprocess
 from ..utils.logging import log_info, log_warn, log_error, log_step
 from ..utils.prompts import prompt_yes_no, prompt_input, prompt_choice
-from ..utils.system import run_command, AptManager, cleanup_stale_nvidia_libraries, repair_nvidia_symlinks, write_egl_icd_default
+from ..utils.system import run_command, AptManager, cleanup_stale_nvidia_libraries, repair_nvidia_symlinks, write_egl_icd_default, get_kernel_release
 
 # Regex that matches a valid NVIDIA driver version string (e.g. 580.126.09 or 590)
 _VERSION_PATTERN = re.compile(r'^[0-9]+\.[0-9]+')
@@ -378,7 +378,7 @@ def _install_driver_prerequisites():
 
 def _get_kernel_version():
     """Get current kernel version"""
-    return run_command("uname -r", capture_output=True).strip()
+    return get_kernel_release()
 
 
 def _detect_hardware():
@@ -7,14 +7,18 @@ discovery and ldconfig symlink creation.
 """
 
 import glob
+import mmap
 import os
 import re
+import shlex
 import shutil
+import struct
 import subprocess
 import tempfile
 from dataclasses import dataclass, field
 from typing import Optional
 
+from ..utils.http import http_get
 from ..utils.logging import log_info, log_step, log_warn, log_success, log_error
 from ..utils.prompts import prompt_yes_no
 from ..utils.system import run_command
@@ -39,6 +43,41 @@ _NVENC_LIMIT_3_MIN_DRIVER = 450
 # Backup directory for original libnvidia-encode.so files
 _BACKUP_DIR = "/opt/nvidia/libnvidia-encode-backup"
 
+# Upstream repository providing patch-fbc.sh
+_NVIDIA_PATCH_REPO = "https://github.com/regix1/nvidia-patch.git"
+
+# Direct download of the NvFBC script (avoids cloning the repository).
+# HEAD resolves to the default branch, the same revision the clone uses.
+_PATCH_FBC_URL = "https://raw.githubusercontent.com/regix1/nvidia-patch/HEAD/patch-fbc.sh"
+_PATCH_FBC_TIMEOUT = 30
+
+# Dynamic linker cache and the magic strings of its two on-disk formats
+_LD_SO_CACHE = "/etc/ld.so.cache"
+_LD_SO_CACHE_MAGICS: tuple[bytes, ...] = (b"glibc-ld.so.cache1.1", b"ld.so-1.7.0")
+
+# ELF constants used by the SONAME reader
+_EI_CLASS = 4
+_EI_DATA = 5
+_PT_LOAD = 1
+_PT_DYNAMIC = 2
+_DT_NULL = 0
+_DT_STRTAB = 5
+_DT_SONAME = 14
+_SONAME_MAX_LEN = 256
+
+# Per ELF class: (header fields after e_ident, program header, dynamic entry).
+# Unneeded fields are skipped with pad bytes so unpack yields only what we use:
+#   header  -> e_phoff, e_phentsize, e_phnum
+#   phdr    -> p_type, p_offset, p_vaddr, p_filesz
+#   dyn     -> d_tag, d_val
+_ELF_LAYOUTS: dict[int, tuple[str, str, str]] = {
+    1: ("8x4xI8x2xHH", "III4xI", "iI"),             # ELFCLASS32
+    2: ("8x8xQ12x2xHH", "I4xQQ8xQ", "qQ"),          # ELFCLASS64
+}
+
+# Memoized SONAME lookups keyed by (path, st_mtime_ns, st_size)
+_SONAME_CACHE: dict[tuple[str, int, int], Optional[str]] = {}
+
 # Standard library search paths (ordered by preference)
 _LIBRARY_SEARCH_PATHS: list[str] = [
     "/usr/lib/x86_64-linux-gnu",
@@ -429,6 +468,9 @@ def _verify_elf_soname(lib_path: str) -> Optional[str]:
     dynamic linker. If it's missing, the library becomes invisible to
     the entire NVIDIA container toolkit chain.
 
+    Results are memoized per (path, mtime_ns, size), so the repeated
+    checks in one patch flow only parse the file once per revision.
+
     Args:
         lib_path: Absolute path to the .so file to check.
 
@@ -436,23 +478,160 @@ def _verify_elf_soname(lib_path: str) -> Optional[str]:
         The SONAME string if found, or None if missing/corrupted.
     """
     try:
-        result = subprocess.run(
-            ["readelf", "-d", lib_path],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode != 0:
-            return None
-        for line in result.stdout.splitlines():
-            if "SONAME" in line:
-                # Extract the SONAME value: [libnvidia-encode.so.1]
-                match = re.search(r'\[(.*?)\]', line)
-                if match:
-                    return match.group(1)
-        return None
+        st = os.stat(lib_path)
     except OSError:
         return None
 
+    key = (lib_path, st.st_mtime_ns, st.st_size)
+    if key in _SONAME_CACHE:
+        return _SONAME_CACHE[key]
+
+    soname = _read_elf_soname(lib_path)
+    _SONAME_CACHE[key] = soname
+    return soname
+
+
+def _invalidate_soname_cache(lib_path: str) -> None:
+    """Drop memoized SONAME results for a library that was rewritten."""
+    for key in [k for k in _SONAME_CACHE if k[0] == lib_path]:
+        del _SONAME_CACHE[key]
+
+
+def _read_elf_soname(lib_path: str) -> Optional[str]:
+    """Read the DT_SONAME string from an ELF shared library.
+
+    Reads only what is needed instead of running ``readelf -d``: the ELF
+    header, the program headers, the PT_DYNAMIC entries, and the single
+    NUL-terminated string the DT_SONAME entry points at.
+
+    Args:
+        lib_path: Absolute path to the .so file to read.
+
+    Returns:
+        The SONAME string if found, or None if missing/corrupted.
+    """
+    try:
+        with open(lib_path, "rb") as fh:
+            ident = fh.read(16)
+            if len(ident) < 16 or ident[:4] != b"\x7fELF":
+                return None
+            if ident[_EI_CLASS] not in _ELF_LAYOUTS or ident[_EI_DATA] not in (1, 2):
+                return None
+            endian = "<" if ident[_EI_DATA] == 1 else ">"
+            hdr_fmt, phdr_fmt, dyn_fmt = _ELF_LAYOUTS[ident[_EI_CLASS]]
+
+            hdr_size = struct.calcsize(endian + hdr_fmt)
+            e_phoff, e_phentsize, e_phnum = struct.unpack(endian + hdr_fmt, fh.read(hdr_size))
+            phdr_size = struct.calcsize(endian + phdr_fmt)
+            if e_phoff == 0 or e_phnum == 0 or e_phentsize < phdr_size:
+                return None
+
+            # Program headers: collect PT_LOAD segments and the PT_DYNAMIC range
+            loads: list[tuple[int, int, int]] = []
+            dynamic: Optional[tuple[int, int]] = None
+            fh.seek(e_phoff)
+            phdrs = fh.read(e_phentsize * e_phnum)
+            for i in range(e_phnum):
+                entry = phdrs[i * e_phentsize : i * e_phentsize + phdr_size]
+                if len(entry) < phdr_size:
+                    return None
+                p_type, p_offset, p_vaddr, p_filesz = struct.unpack(endian + phdr_fmt, entry)
+                if p_type == _PT_LOAD:
+                    loads.append((p_vaddr, p_offset, p_filesz))
+                elif p_type == _PT_DYNAMIC:
+                    dynamic = (p_offset, p_filesz)
+            if dynamic is None:
+                return None
+
+            # Dynamic section: find DT_SONAME (strtab index) and DT_STRTAB (vaddr)
+            soname_idx: Optional[int] = None
+            strtab_addr: Optional[int] = None
+            dyn_size = struct.calcsize(endian + dyn_fmt)
+            fh.seek(dynamic[0])
+            dyn_data = fh.read(dynamic[1])
+            for d_tag, d_val in struct.iter_unpack(
+                endian + dyn_fmt, dyn_data[: len(dyn_data) - len(dyn_data) % dyn_size]
+            ):
+                if d_tag == _DT_NULL:
+                    break
+                if d_tag == _DT_SONAME:
+                    soname_idx = d_val
+                elif d_tag == _DT_STRTAB:
+                    strtab_addr = d_val
+            if soname_idx is None or strtab_addr is None:
+                return None
+
+            # Map the string table's virtual address to a file offset
+            for p_vaddr, p_offset, p_filesz in loads:
+                if p_vaddr <= strtab_addr < p_vaddr + p_filesz:
+                    fh.seek(p_offset + (strtab_addr - p_vaddr) + soname_idx)
+                    name = fh.read(_SONAME_MAX_LEN).split(b"\0", 1)[0]
+                    return name.decode("utf-8", "replace") or None
+        return None
+    except (OSError, struct.error):
+        return None
+
+
+# ── Linker cache lookup ────────────────────────────────────────────
+
+def _ld_cache_contains(name: bytes) -> bool:
+    """Check whether a library name appears in the dynamic linker cache.
+
+    Reads /etc/ld.so.cache directly instead of spawning
+    ``ldconfig -p | grep``.  The cache string table holds every SONAME
+    and path, so a substring scan is enough to tell whether ldconfig
+    picked the library up.
+
+    Args:
+        name: Library name (or prefix) to look for, e.g. b"libnvidia-encode".
+
+    Returns:
+        True if found, False if missing or the cache is unreadable.
+    """
+    try:
+        with open(_LD_SO_CACHE, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, prot=mmap.PROT_READ) as buf:
+                if not any(buf[:len(magic)] == magic for magic in _LD_SO_CACHE_MAGICS):
+                    return False
+                return buf.find(name) != -1
+    except (OSError, ValueError):
+        return False
+
+
+def _refresh_linker_cache(lib_path: str, soname_changed: bool) -> bool:
+    """Update the linker state after a library was rewritten in place.
+
+    When the SONAME is unchanged the cache entry (SONAME -> path) is still
+    valid, so only the library's own symlink is refreshed with
+    ``ldconfig -l``.  A changed SONAME needs a full cache rebuild, which
+    rescans every configured directory; that is started detached so the
+    caller does not wait on it.
+
+    Args:
+        lib_path: Absolute path to the library that was modified.
+        soname_changed: True if the SONAME differs from before the write.
+
+    Returns:
+        True if the cache was updated synchronously, False if a background
+        rebuild was started instead.
+    """
+    if not soname_changed:
+        run_command(f"ldconfig -l {shlex.quote(lib_path)}", check=False)
+        return True
+
+    log_info("Running: ldconfig (background)")
+    try:
+        subprocess.Popen(
+            ["ldconfig"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as exc:
+        log_warn(f"Could not start ldconfig: {exc}")
+    return False
+
 
 # ── Library locating ────────────────────────────────────────────────
 
@@ -534,8 +713,10 @@ def _create_backup(lib_path: str, version: str, dry_run: bool = False) -> bool:
 def _restore_backup(version: str, lib_path: str, dry_run: bool = False) -> bool:
     """Restore the original libnvidia-encode.so from backup.
 
-    Copies the backup file back over the current library and runs ldconfig
-    to rebuild the dynamic linker cache.
+    Copies the backup file back over the current library and refreshes
+    the linker state.  If the restore changes the SONAME (e.g. the
+    installed copy had lost it) the ldconfig cache is rebuilt; otherwise
+    only the library's symlink is refreshed.
 
     Args:
         version: Driver version string.
@@ -556,9 +737,14 @@ def _restore_backup(version: str, lib_path: str, dry_run: bool = False) -> bool:
         return True
 
     try:
+        soname_before = _verify_elf_soname(lib_path)
         shutil.copy2(backup_file, lib_path)
-        run_command("ldconfig", check=False)
-        log_success("Restored from backup and ran ldconfig")
+        _invalidate_soname_cache(lib_path)
+        soname_after = _verify_elf_soname(lib_path)
+        if _refresh_linker_cache(lib_path, soname_changed=soname_after != soname_before):
+            log_success("Restored from backup and refreshed the library symlink")
+        else:
+            log_success("Restored from backup; ldconfig cache rebuild running in the background")
         return True
     except OSError as exc:
         log_error(f"Failed to restore from backup: {exc}")
@@ -703,6 +889,7 @@ def _patch_binary(lib_path: str, dry_run: bool = False, verbose: bool = False) -
             try:
                 with open(lib_path, "wb") as fh:
                     fh.write(data)
+                _invalidate_soname_cache(lib_path)
             except OSError as exc:
                 return PatchResult(
                     success=False,
@@ -860,6 +1047,7 @@ def _apply_nvenc_patch(
         return
 
     log_success(f"Driver version: {driver_version}")
+    encode_pkg = f"libnvidia-encode-{driver_version.split('.', 1)[0]}"
 
     # ── Find library ────────────────────────────────────────────────
     log_info("Locating libnvidia-encode.so...")
@@ -867,8 +1055,7 @@ def _apply_nvenc_patch(
 
     if lib_path is None:
         log_error(f"Could not find libnvidia-encode.so.{driver_version}")
-        log_warn("Ensure the driver is properly installed: apt reinstall libnvidia-encode-" +
-                 driver_version.split('.')[0])
+        log_warn(f"Ensure the driver is properly installed: apt reinstall {encode_pkg}")
         return
 
     log_success(f"Library: {lib_path}")
@@ -881,7 +1068,7 @@ def _apply_nvenc_patch(
     else:
         log_warn("ELF SONAME is already missing from this library!")
         log_warn("This may indicate a previous sed-based patch corrupted the file")
-        log_warn(f"Consider: apt reinstall libnvidia-encode-{driver_version.split('.')[0]}")
+        log_warn(f"Consider: apt reinstall {encode_pkg}")
         if not rollback:
             return
 
@@ -895,7 +1082,7 @@ def _apply_nvenc_patch(
                     log_success(f"SONAME verified after rollback: {soname_after}")
                 else:
                     log_warn("SONAME still missing after rollback -- backup may also be corrupted")
-                    log_warn(f"Reinstall the package: apt reinstall libnvidia-encode-{driver_version.split('.')[0]}")
+                    log_warn(f"Reinstall the package: apt reinstall {encode_pkg}")
             return
         log_error("Rollback failed")
         return
@@ -937,24 +1124,16 @@ def _apply_nvenc_patch(
     if soname_after:
         log_success(f"ELF SONAME intact: {soname_after}")
 
-    # Rebuild linker cache after successful patch
-    run_command("ldconfig", check=False)
-
-    # Verify ldconfig sees the library
-    try:
-        result = subprocess.run(
-            "ldconfig -p | grep nvidia-encode",
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
-        if "libnvidia-encode" in result.stdout:
-            log_success("ldconfig cache updated -- library is discoverable")
-        else:
-            log_warn("Library not found in ldconfig cache -- containers may not discover it")
-            log_warn("Run: ldconfig && ldconfig -p | grep nvidia-encode")
-    except OSError:
-        pass
+    # Refresh linker state after successful patch
+    if not _refresh_linker_cache(lib_path, soname_changed=soname_after != soname_before):
+        log_info("ldconfig cache rebuild running in the background")
+    elif _ld_cache_contains(b"libnvidia-encode"):
+        # SONAME unchanged: only the symlink was refreshed, the existing
+        # cache entry still points at this library
+        log_success("Library symlink refreshed -- existing ldconfig cache entry still applies")
+    else:
+        log_warn("Library not found in ldconfig cache -- containers may not discover it")
+        log_warn("Run: ldconfig && ldconfig -p | grep nvidia-encode")
 
     log_success("NVENC session limit removed!")
     log_info(f"Backup: {_BACKUP_DIR}/libnvidia-encode.so.{driver_version}.orig")
@@ -980,7 +1159,7 @@ def _apply_nvfbc_patch() -> None:
 
 
 def _apply_upstream_nvfbc_script() -> None:
-    """Clone regix1/nvidia-patch and run patch-fbc.sh.
+    """Fetch regix1/nvidia-patch's patch-fbc.sh and run it.
 
     The upstream keylase scripts use nvidia-smi internally and do not
     accept a version override flag.  If nvidia-smi is broken (version
@@ -1006,8 +1185,8 @@ def _apply_upstream_nvfbc_script() -> None:
         original_dir = os.getcwd()
         try:
             os.chdir(tmp)
-            run_command("git clone https://github.com/regix1/nvidia-patch.git .")
-            run_command("chmod +x patch-fbc.sh")
+            if not _download_patch_fbc_script(tmp):
+                _clone_nvidia_patch(tmp)
             run_command("bash ./patch-fbc.sh")
             log_success("NvFBC patch applied!")
             log_warn("Verify library integrity: readelf -d /usr/lib/x86_64-linux-gnu/libnvidia-fbc.so.* | grep SONAME")
@@ -1019,3 +1198,44 @@ def _apply_upstream_nvfbc_script() -> None:
             log_warn("You can manually apply the patch later if needed")
         finally:
             os.chdir(original_dir)
+
+
+def _download_patch_fbc_script(dest: str) -> bool:
+    """Download patch-fbc.sh on its own into ``dest``.
+
+    The script is self-contained, so a single HTTPS GET replaces cloning
+    the whole repository.
+
+    Args:
+        dest: Directory to write patch-fbc.sh into.
+
+    Returns:
+        True if the script was written, False if the download failed.
+    """
+    try:
+        with http_get(_PATCH_FBC_URL, timeout=_PATCH_FBC_TIMEOUT) as resp:
+            script = resp.read()
+        with open(os.path.join(dest, "patch-fbc.sh"), "wb") as fh:
+            fh.write(script)
+        return True
+    except (OSError, ValueError) as exc:
+        log_warn(f"Could not download patch-fbc.sh ({exc}), falling back to git")
+        return False
+
+
+def _clone_nvidia_patch(dest: str) -> None:
+    """Shallow-clone regix1/nvidia-patch into ``dest``.
+
+    Only used when the direct download of patch-fbc.sh fails.
+
+    Args:
+        dest: Empty directory to clone into.
+
+    Raises:
+        subprocess.CalledProcessError: If the clone fails.
+    """
+    # Only patch-fbc.sh at HEAD is needed, so skip history and tags
+    run_command(
+        f"git clone --depth 1 --single-branch --no-tags "
+        f"{_NVIDIA_PATCH_REPO} {shlex.quote(dest)}"
+    )
@@ -8,23 +8,44 @@ official tarball, and configures the environment.  APT-based
 installation was deprecated by LunarG in May 2025.
 """
 
+import functools
+import hashlib
 import json
 import os
 import platform
 import re
 import shutil
-import urllib.request
-from typing import Optional
-
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+    _json_loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from ..utils.http import http_get
 from ..utils.logging import log_info, log_warn, log_error, log_step, log_success
 from ..utils.prompts import prompt_yes_no, prompt_choice, prompt_input
-from ..utils.system import run_command, AptManager, write_egl_icd_default, detect_gpu_vendors
+from ..utils.system import (
+    run_command, AptManager, write_egl_icd_default, detect_gpu_vendors, get_cache_dir,
+    write_file_if_changed, dpkg_has_file_list,
+)
 
 # LunarG API endpoints
 _LUNARG_VERSIONS_URL = "https://vulkan.lunarg.com/sdk/versions/linux.json"
 _LUNARG_LATEST_URL = "https://vulkan.lunarg.com/sdk/latest/linux.json"
 _LUNARG_TIMEOUT = 15
 
+# On-disk cache for LunarG API responses (directory overridable for
+# air-gapped installs that ship a pre-populated cache)
+_LUNARG_CACHE_SUBDIR = "lunarg"
+_LUNARG_CACHE_ENV = "NVIDIA_SETUP_LUNARG_CACHE"
+_LUNARG_CACHE_TTL = 24 * 60 * 60
+
 # Tarball download endpoints
 _LUNARG_DOWNLOAD_BASE = "https://sdk.lunarg.com/sdk/download"
 _LUNARG_SHA_BASE = "https://sdk.lunarg.com/sdk/sha"
@@ -32,13 +53,32 @@ _LUNARG_SHA_BASE = "https://sdk.lunarg.com/sdk/sha"
 # Installation paths
 _VULKAN_SDK_BASE = "/opt/vulkan-sdk"
 _VULKAN_PROFILE_SCRIPT = "/etc/profile.d/vulkan-sdk.sh"
+_STAGING_PREFIX = ".tmp."
+
+# Set to 1 to also save the streamed tarball here (for debugging)
+_KEEP_TARBALL_ENV = "NVIDIA_SETUP_KEEP_TARBALL"
 _DOWNLOAD_PATH = "/tmp/vulkan_sdk.tar.xz"
+_DOWNLOAD_CHUNK = 1 << 20
+
+# SDK version embedded in a path (e.g. /opt/vulkan-sdk/1.4.341.0/x86_64)
+_VERSION_RE = re.compile(r"(\d+\.\d+\.\d+(?:\.\d+)?)")
+# SDK version directory name under the install base (e.g. 1.4.341.0)
+_VERSION_DIR_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
+# Vulkan API family label per SDK (major, minor); newer SDKs use the newest label
+_VULKAN_FAMILY_TAGS: dict[tuple[int, int], str] = {
+    (1, 4): "Vulkan 1.4",
+    (1, 3): "Vulkan 1.3",
+    (1, 2): "Vulkan 1.2",
+}
+_VULKAN_NEWEST_FAMILY = max(_VULKAN_FAMILY_TAGS)
 
 
 # ---------------------------------------------------------------------------
 # Detection
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=1)
 def _get_arch() -> str:
     """Return the platform subdirectory used inside the SDK tarball."""
     machine = platform.machine()
@@ -60,40 +100,43 @@ def _detect_vulkan_sdk() -> Optional[str]:
     if os.path.islink(current_link):
         target = os.readlink(current_link)
         name = os.path.basename(target)
-        if re.match(r"\d+\.\d+\.\d+", name):
+        if _VERSION_DIR_RE.match(name):
             return name
 
     # Check for any version directory in the install base
     if os.path.isdir(_VULKAN_SDK_BASE):
         try:
-            dirs = [
-                e.name for e in os.scandir(_VULKAN_SDK_BASE)
-                if e.is_dir() and re.match(r"\d+\.\d+\.\d+", e.name)
-            ]
-            if dirs:
-                dirs.sort(
-                    key=lambda v: [int(x) for x in v.split(".")[:3]],
-                    reverse=True,
-                )
-                return dirs[0]
+            # Decorate each name with its numeric key once; only the newest is needed
+            newest = max(
+                (
+                    (tuple(map(int, m.groups())), e.name)
+                    for e in os.scandir(_VULKAN_SDK_BASE)
+                    if e.is_dir() and (m := _VERSION_DIR_RE.match(e.name))
+                ),
+                default=None,
+            )
+            if newest:
+                return newest[1]
         except OSError:
             pass
 
     # Legacy: dpkg APT install
-    try:
-        output = run_command(
-            "dpkg -s vulkan-sdk 2>/dev/null | grep '^Version:'",
-            capture_output=True, check=False,
-        )
-        if output and "Version:" in output:
-            return output.split("Version:")[1].strip() + " (APT - deprecated)"
-    except Exception:
-        pass
+    if dpkg_has_file_list("vulkan-sdk"):
+        try:
+            output = run_command(
+                ["dpkg-query", "-W", "-f=${Status}\t${Version}", "vulkan-sdk"],
+                shell=False, capture_output=True, check=False,
+            )
+            status, _, version = (output or "").partition("\t")
+            if status == "install ok installed" and version:
+                return version + " (APT - deprecated)"
+        except Exception:
+            pass
 
     # Fallback: VULKAN_SDK environment variable
     sdk_path = os.environ.get("VULKAN_SDK")
     if sdk_path and os.path.isdir(sdk_path):
-        match = re.search(r"(\d+\.\d+\.\d+(?:\.\d+)?)", sdk_path)
+        match = _VERSION_RE.search(sdk_path)
         if match:
             return match.group(1)
         return "unknown"
@@ -112,12 +155,12 @@ def _classify_vulkan_version(version: str) -> str:
         major, minor = int(parts[0]), int(parts[1])
     except (IndexError, ValueError):
         return ""
-    if (major, minor) >= (1, 4):
-        return "Vulkan 1.4"
-    if (major, minor) >= (1, 3):
-        return "Vulkan 1.3"
-    if (major, minor) >= (1, 2):
-        return "Vulkan 1.2"
+    family = (major, minor)
+    tag = _VULKAN_FAMILY_TAGS.get(family)
+    if tag:
+        return tag
+    if family > _VULKAN_NEWEST_FAMILY:
+        return _VULKAN_FAMILY_TAGS[_VULKAN_NEWEST_FAMILY]
     return "Vulkan 1.1 or earlier"
 
 
@@ -125,6 +168,108 @@ def _classify_vulkan_version(version: str) -> str:
 # Version fetching (live from LunarG API)
 # ---------------------------------------------------------------------------
 
+def _lunarg_cache_dir() -> str:
+    """Return (and create) the LunarG cache directory.
+
+    ``$NVIDIA_SETUP_LUNARG_CACHE`` takes precedence over the default
+    location under the tool's cache root.
+    """
+    override = os.environ.get(_LUNARG_CACHE_ENV)
+    if override:
+        os.makedirs(override, exist_ok=True)
+        return override
+    return get_cache_dir(_LUNARG_CACHE_SUBDIR)
+
+
+def _write_cache_file(path: str, data: bytes) -> None:
+    """Atomically replace a cache file, ignoring write failures."""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _cached_lunarg_json(url: str, filename: str, ttl: int = _LUNARG_CACHE_TTL) -> Any:
+    """GET a LunarG JSON document through the on-disk cache.
+
+    A cached body younger than ``ttl`` seconds is returned without
+    touching the network.  An older one is revalidated with
+    ``If-None-Match`` / ``If-Modified-Since`` using the validators saved
+    next to it: a 304 restarts its TTL and returns it unchanged, a 200
+    atomically replaces body and validators.  If the request fails, a
+    stale cached body is returned when available.
+
+    Args:
+        url: LunarG API endpoint.
+        filename: Cache file name under the LunarG cache directory.
+        ttl: Freshness window in seconds.
+
+    Returns:
+        The decoded JSON document.
+
+    Raises:
+        Exception: If the request fails and nothing is cached.
+    """
+    try:
+        cache_path: Optional[str] = os.path.join(_lunarg_cache_dir(), filename)
+    except OSError:
+        cache_path = None
+    meta_path = f"{cache_path}.meta" if cache_path else None
+
+    cached = None
+    headers: dict[str, str] = {}
+    if cache_path:
+        try:
+            age = time.time() - os.stat(cache_path).st_mtime
+            with open(cache_path, "rb") as fh:
+                cached = _json_loads(fh.read())
+            if age < ttl:
+                return cached
+            with open(meta_path, "rb") as fh:
+                validators = _json_loads(fh.read())
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    try:
+        with http_get(url, headers=headers, timeout=_LUNARG_TIMEOUT) as resp:
+            body = resp.read()
+            if resp.status == 304 and cached is not None:
+                try:
+                    os.utime(cache_path)
+                except OSError:
+                    pass
+                return cached
+            validators = {
+                "etag": resp.getheader("ETag"),
+                "last_modified": resp.getheader("Last-Modified"),
+            }
+        data = _json_loads(body)
+    except Exception as exc:
+        if cached is None:
+            raise
+        log_warn(f"Could not reach LunarG API: {exc}")
+        log_info("Using cached LunarG data (API unavailable)")
+        return cached
+
+    if cache_path:
+        _write_cache_file(cache_path, body)
+        _write_cache_file(meta_path, json.dumps(validators).encode())
+    return data
+
+
 def _get_vulkan_sdk_versions() -> Optional[list[str]]:
     """Query the LunarG API for available Vulkan SDK versions.
 
@@ -132,12 +277,7 @@ def _get_vulkan_sdk_versions() -> Optional[list[str]]:
         List of version strings (newest first), or None on failure.
     """
     try:
-        req = urllib.request.Request(
-            _LUNARG_VERSIONS_URL,
-            headers={"User-Agent": "nvidia-driver-setup/1.0"},
-        )
-        resp = urllib.request.urlopen(req, timeout=_LUNARG_TIMEOUT)
-        data = json.loads(resp.read())
+        data = _cached_lunarg_json(_LUNARG_VERSIONS_URL, "versions.json")
 
         if isinstance(data, list) and data:
             return [str(v) for v in data]
@@ -154,12 +294,7 @@ def _get_latest_vulkan_sdk_version() -> Optional[str]:
         Latest version string, or None on failure.
     """
     try:
-        req = urllib.request.Request(
-            _LUNARG_LATEST_URL,
-            headers={"User-Agent": "nvidia-driver-setup/1.0"},
-        )
-        resp = urllib.request.urlopen(req, timeout=_LUNARG_TIMEOUT)
-        data = json.loads(resp.read())
+        data = _cached_lunarg_json(_LUNARG_LATEST_URL, "latest.json")
 
         if isinstance(data, dict):
             return str(data.get("linux") or data.get("version") or "") or None
@@ -180,8 +315,8 @@ def _load_fallback_versions() -> dict[str, str]:
         "..", "..", "configs", "vulkan_versions.json",
     )
     try:
-        with open(config_path, "r") as fh:
-            return json.load(fh)
+        with open(config_path, "rb") as fh:
+            return _json_loads(fh.read())
     except (FileNotFoundError, json.JSONDecodeError):
         return {
             "1.4.341.1": "Latest - Vulkan 1.4",
@@ -195,63 +330,71 @@ def _load_fallback_versions() -> dict[str, str]:
 # Download and verification
 # ---------------------------------------------------------------------------
 
-def _download_tarball(version: str) -> bool:
-    """Download the Vulkan SDK tarball.
+class _HashingReader:
+    """Read-through wrapper that feeds every byte read into a digest.
+
+    When ``sink`` is given, the bytes are also written to it.
+    """
+
+    def __init__(self, raw: Any, digest: Any, sink: Any = None) -> None:
+        self._raw = raw
+        self._sink = sink
+        self.digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self.digest.update(data)
+        if self._sink is not None:
+            self._sink.write(data)
+        return data
+
+    def drain(self) -> None:
+        """Read (and hash) whatever the consumer left unread."""
+        while self.read(_DOWNLOAD_CHUNK):
+            pass
+
+
+def _fetch_expected_sha(version: str) -> str:
+    """Fetch the published SHA256 of the SDK tarball.
 
     Args:
-        version: SDK version string (e.g. "1.4.341.0").
+        version: SDK version string.
 
     Returns:
-        True on success.
+        Lowercase hex digest.
     """
-    url = f"{_LUNARG_DOWNLOAD_BASE}/{version}/linux/vulkan_sdk.tar.xz?Human=true"
-    log_info(f"Downloading Vulkan SDK {version} tarball...")
-    try:
-        run_command(f"wget -O {_DOWNLOAD_PATH} '{url}'")
-        return True
-    except Exception as exc:
-        log_error(f"Download failed: {exc}")
-        return False
+    sha_url = f"{_LUNARG_SHA_BASE}/{version}/linux/vulkan_sdk.tar.xz.txt"
+    with http_get(sha_url, timeout=_LUNARG_TIMEOUT) as resp:
+        return resp.read().decode().strip().split()[0].lower()
 
 
-def _verify_sha256(version: str) -> bool:
-    """Verify SHA256 checksum of the downloaded tarball.
+def _verify_sha256(version: str, actual: str, expected: Optional[str] = None) -> bool:
+    """Compare the downloaded tarball's SHA256 with the published one.
 
     Args:
         version: SDK version used to look up the expected hash.
+        actual: Hex digest computed while downloading.
+        expected: Hash fetched ahead of time; fetched here when None.
 
     Returns:
         True if checksum matches or verification was skipped.
     """
-    sha_url = f"{_LUNARG_SHA_BASE}/{version}/linux/vulkan_sdk.tar.xz.txt"
-    try:
-        req = urllib.request.Request(
-            sha_url,
-            headers={"User-Agent": "nvidia-driver-setup/1.0"},
-        )
-        resp = urllib.request.urlopen(req, timeout=_LUNARG_TIMEOUT)
-        expected = resp.read().decode().strip().split()[0]
-
-        log_info("Verifying SHA256 checksum...")
-        output = run_command(
-            f"sha256sum {_DOWNLOAD_PATH}",
-            capture_output=True, check=False,
-        )
-        if output:
-            actual = output.strip().split()[0]
-            if actual == expected:
-                log_success("SHA256 checksum verified")
-                return True
-            log_error(
-                f"SHA256 mismatch! Expected: {expected[:16]}... "
-                f"Got: {actual[:16]}..."
-            )
-            return False
-        log_warn("sha256sum not available, skipping verification")
-        return True
-    except Exception as exc:
-        log_warn(f"Could not verify checksum (continuing): {exc}")
+    log_info("Verifying SHA256 checksum...")
+    if expected is None:
+        try:
+            expected = _fetch_expected_sha(version)
+        except Exception as exc:
+            log_warn(f"Could not verify checksum (continuing): {exc}")
+            return True
+
+    if actual == expected:
+        log_success("SHA256 checksum verified")
         return True
+    log_error(
+        f"SHA256 mismatch! Expected: {expected[:16]}... "
+        f"Got: {actual[:16]}..."
+    )
+    return False
 
 
 # ---------------------------------------------------------------------------
@@ -270,41 +413,90 @@ def _install_runtime_deps() -> None:
         log_info("SDK tools like vkcube may not work without them.")
 
 
-def _extract_tarball(version: str) -> bool:
-    """Extract the SDK tarball to the install location.
+def _staging_dir(version: str) -> str:
+    """Return the scratch directory a version is extracted into."""
+    return os.path.join(_VULKAN_SDK_BASE, f"{_STAGING_PREFIX}{version}")
+
+
+def _download_and_extract(version: str) -> Optional[str]:
+    """Stream the SDK tarball from LunarG into a staging directory.
+
+    The response is decompressed and unpacked as it arrives, and the
+    SHA256 is computed over the compressed bytes on the way through, so
+    the tarball is never written to disk or read back (unless
+    ``$NVIDIA_SETUP_KEEP_TARBALL=1`` asks for a copy at ``_DOWNLOAD_PATH``).
 
     The tarball contains a top-level directory named after the version
-    (e.g. ``1.4.341.0/``).  We extract into ``_VULKAN_SDK_BASE`` so
-    the result is ``/opt/vulkan-sdk/1.4.341.0/``.
+    (e.g. ``1.4.341.0/``).  It lands in ``_VULKAN_SDK_BASE/.tmp.<version>/``
+    and is only moved into place by :func:`_promote_staged_install` once
+    the checksum has been checked.
 
     Args:
-        version: Expected version directory name.
+        version: SDK version string (e.g. "1.4.341.0").
 
     Returns:
-        True if extraction succeeded.
+        Hex SHA256 of the downloaded tarball, or None on failure.
     """
-    install_dir = os.path.join(_VULKAN_SDK_BASE, version)
+    staging = _staging_dir(version)
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
 
-    os.makedirs(_VULKAN_SDK_BASE, exist_ok=True)
+    url = f"{_LUNARG_DOWNLOAD_BASE}/{version}/linux/vulkan_sdk.tar.xz?Human=true"
+    log_info(f"Downloading and extracting Vulkan SDK {version}...")
+    keep = None
+    try:
+        if os.environ.get(_KEEP_TARBALL_ENV) == "1":
+            keep = open(_DOWNLOAD_PATH, "wb")
+            log_info(f"Keeping a copy of the tarball at {_DOWNLOAD_PATH}")
+        with http_get(url, timeout=_LUNARG_TIMEOUT) as resp:
+            reader = _HashingReader(resp, hashlib.sha256(), keep)
+            with tarfile.open(fileobj=reader, mode="r|xz", bufsize=_DOWNLOAD_CHUNK) as tar:
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(staging, filter="data")
+                else:
+                    tar.extractall(staging)
+            # Trailing tar padding still counts towards the checksum
+            reader.drain()
+    except Exception as exc:
+        log_error(f"Download failed: {exc}")
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+    finally:
+        if keep is not None:
+            keep.close()
+
+    if not os.path.isdir(os.path.join(staging, version)):
+        log_error(f"Expected directory {version}/ not found in the tarball")
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+
+    return reader.digest.hexdigest()
+
+
+def _promote_staged_install(version: str) -> bool:
+    """Move a verified staging extraction to ``_VULKAN_SDK_BASE/<version>``.
+
+    An existing install of the same version is replaced.
 
-    # Remove previous install of the same version
-    if os.path.isdir(install_dir):
-        log_info(f"Removing previous install at {install_dir}...")
-        shutil.rmtree(install_dir)
+    Returns:
+        True if the SDK is now in place.
+    """
+    staging = _staging_dir(version)
+    install_dir = os.path.join(_VULKAN_SDK_BASE, version)
 
-    log_info(f"Extracting to {_VULKAN_SDK_BASE}/...")
     try:
-        run_command(f"tar xf {_DOWNLOAD_PATH} -C {_VULKAN_SDK_BASE}")
-    except Exception as exc:
-        log_error(f"Extraction failed: {exc}")
+        if os.path.isdir(install_dir):
+            log_info(f"Replacing previous install at {install_dir}...")
+            shutil.rmtree(install_dir)
+        os.rename(os.path.join(staging, version), install_dir)
+    except OSError as exc:
+        log_error(f"Could not move SDK into {install_dir}: {exc}")
         return False
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
 
-    if os.path.isdir(install_dir):
-        log_success(f"Extracted to {install_dir}")
-        return True
-
-    log_error(f"Expected directory {install_dir} not found after extraction")
-    return False
+    log_success(f"Extracted to {install_dir}")
+    return True
 
 
 def _create_current_symlink(version: str) -> None:
@@ -342,12 +534,12 @@ def _configure_environment() -> None:
         'fi\n'
     )
 
-    log_info(f"Writing Vulkan SDK environment script to {_VULKAN_PROFILE_SCRIPT}...")
     try:
-        with open(_VULKAN_PROFILE_SCRIPT, "w") as fh:
-            fh.write(script_content)
-        os.chmod(_VULKAN_PROFILE_SCRIPT, 0o644)
-        log_success("Vulkan SDK environment configured (effective on next login)")
+        if write_file_if_changed(_VULKAN_PROFILE_SCRIPT, script_content):
+            log_info(f"Wrote Vulkan SDK environment script to {_VULKAN_PROFILE_SCRIPT}")
+            log_success("Vulkan SDK environment configured (effective on next login)")
+        else:
+            log_info(f"{_VULKAN_PROFILE_SCRIPT} is already up to date")
     except OSError as exc:
         log_warn(f"Could not write {_VULKAN_PROFILE_SCRIPT}: {exc}")
         log_info(f"You can manually source: {_VULKAN_SDK_BASE}/current/setup-env.sh")
@@ -356,6 +548,18 @@ def _configure_environment() -> None:
     _activate_environment()
 
 
+def _prepend_env_path(name: str, entry: str) -> None:
+    """Prepend ``entry`` to a ``:``-separated environment variable.
+
+    Membership is checked per component, so a directory that merely
+    shares a prefix with ``entry`` does not count as present.
+    """
+    current = os.environ.get(name, "")
+    parts = current.split(os.pathsep) if current else []
+    if entry not in parts:
+        os.environ[name] = os.pathsep.join([entry, *parts])
+
+
 def _activate_environment() -> None:
     """Set Vulkan SDK environment variables in the current process.
 
@@ -370,15 +574,8 @@ def _activate_environment() -> None:
 
     os.environ["VULKAN_SDK"] = sdk_dir
 
-    sdk_bin = os.path.join(sdk_dir, "bin")
-    path = os.environ.get("PATH", "")
-    if sdk_bin not in path:
-        os.environ["PATH"] = f"{sdk_bin}:{path}"
-
-    sdk_lib = os.path.join(sdk_dir, "lib")
-    ld_path = os.environ.get("LD_LIBRARY_PATH", "")
-    if sdk_lib not in ld_path:
-        os.environ["LD_LIBRARY_PATH"] = f"{sdk_lib}:{ld_path}" if ld_path else sdk_lib
+    _prepend_env_path("PATH", os.path.join(sdk_dir, "bin"))
+    _prepend_env_path("LD_LIBRARY_PATH", os.path.join(sdk_dir, "lib"))
 
     layer_path = os.path.join(sdk_dir, "share", "vulkan", "explicit_layer.d")
     os.environ["VK_ADD_LAYER_PATH"] = layer_path
@@ -402,19 +599,30 @@ def _verify_vulkan_sdk() -> bool:
     arch = _get_arch()
     sdk_bin = os.path.join(_VULKAN_SDK_BASE, "current", arch, "bin")
 
+    # One directory listing instead of a stat per tool
+    try:
+        with os.scandir(sdk_bin) as entries:
+            present = {e.name for e in entries if e.is_file()}
+    except OSError:
+        present = set()
+
     for tool in ("vulkaninfo", "glslangValidator", "spirv-val"):
-        tool_path = os.path.join(sdk_bin, tool)
-        if os.path.isfile(tool_path):
+        if tool in present:
             log_success(f"  {tool} found")
         else:
-            log_warn(f"  {tool} not found at {tool_path}")
+            log_warn(f"  {tool} not found at {os.path.join(sdk_bin, tool)}")
 
-    # Try running vulkaninfo
-    output = run_command(
-        f"bash -c 'source {_VULKAN_PROFILE_SCRIPT} 2>/dev/null; "
-        f"vulkaninfo --summary' 2>&1",
-        capture_output=True, check=False,
-    )
+    # Try running vulkaninfo; _activate_environment already exported the
+    # SDK variables into this process, so no login shell is needed
+    output = None
+    if "vulkaninfo" in present:
+        try:
+            output = run_command(
+                [os.path.join(sdk_bin, "vulkaninfo"), "--summary"],
+                shell=False, capture_output=True, check=False,
+            )
+        except OSError:
+            pass
     if output and ("Vulkan Instance Version" in output or "apiVersion" in output):
         log_success("vulkaninfo reports Vulkan is working")
         return True
@@ -514,33 +722,29 @@ def install_vulkan_sdk() -> None:
 
     # Fetch available versions from LunarG API
     log_info("Fetching available Vulkan SDK versions...")
-    latest = _get_latest_vulkan_sdk_version()
-    live_versions = _get_vulkan_sdk_versions()
+    # The two API calls are independent; overlap their round-trips
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        latest_future = executor.submit(_get_latest_vulkan_sdk_version)
+        versions_future = executor.submit(_get_vulkan_sdk_versions)
+        latest = latest_future.result()
+        live_versions = versions_future.result()
 
     if live_versions:
         log_info(f"Found {len(live_versions)} versions from LunarG API.")
 
-        display_versions = live_versions[:15]
-        choices: list[str] = []
-        version_list: list[str] = []
-
-        for i, ver in enumerate(display_versions):
-            tag = _classify_vulkan_version(ver)
-            latest_tag = " (latest)" if latest and ver == latest else ""
-            recommended = " (recommended)" if i == 0 else ""
-            choices.append(f"{ver} - {tag}{latest_tag}{recommended}")
-            version_list.append(ver)
-
+        version_list = live_versions[:15]
+        choices = [
+            f"{ver} - {_classify_vulkan_version(ver)}"
+            f"{' (latest)' if latest and ver == latest else ''}"
+            f"{' (recommended)' if i == 0 else ''}"
+            for i, ver in enumerate(version_list)
+        ]
         choices.append("Enter custom version")
     else:
         log_warn("Could not fetch live versions, using offline list.")
         fallback = _load_fallback_versions()
-        choices = []
-        version_list = []
-        for ver, desc in fallback.items():
-            choices.append(f"{ver} - {desc}")
-            version_list.append(ver)
-
+        version_list = list(fallback)
+        choices = [f"{ver} - {desc}" for ver, desc in fallback.items()]
         choices.append("Enter custom version")
 
     # Display the menu
@@ -567,36 +771,35 @@ def install_vulkan_sdk() -> None:
 
     # Download, verify, extract
     try:
-        if not _download_tarball(selected_version):
+        # Fetch the small checksum file while the tarball streams in
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            sha_future = executor.submit(_fetch_expected_sha, selected_version)
+            actual_sha = _download_and_extract(selected_version)
+            try:
+                expected_sha: Optional[str] = sha_future.result()
+            except Exception:
+                expected_sha = None  # retried in-band by _verify_sha256
+
+        if actual_sha is None:
             log_info("You can manually download from: "
                      "https://vulkan.lunarg.com/sdk/home")
             return
 
-        # Verify checksum
-        if not _verify_sha256(selected_version):
+        # Verify checksum before the SDK replaces anything under /opt
+        if not _verify_sha256(selected_version, actual_sha, expected_sha):
             if not prompt_yes_no("SHA256 verification failed. Continue anyway?"):
-                try:
-                    os.unlink(_DOWNLOAD_PATH)
-                except OSError:
-                    pass
+                shutil.rmtree(_staging_dir(selected_version), ignore_errors=True)
                 return
 
+        if not _promote_staged_install(selected_version):
+            return
+
         # Install runtime dependencies
         _install_runtime_deps()
-
-        # Extract tarball
-        if not _extract_tarball(selected_version):
-            return
     except Exception as exc:
         log_error(f"Installation failed: {exc}")
         log_info("Check your internet connection and try again.")
         return
-    finally:
-        # Always clean up the downloaded tarball
-        try:
-            os.unlink(_DOWNLOAD_PATH)
-        except OSError:
-            pass
 
     # Create current symlink
     _create_current_symlink(selected_version)
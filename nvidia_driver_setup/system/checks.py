@@ -1,261 +1,454 @@
 """System checks and validation"""
 
+import bisect
+import functools
+import json
 import subprocess
 import sys
 import os
 import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+from ..utils import nvml
 from ..utils.logging import log_info, log_warn, log_error, log_step
 from ..utils.prompts import prompt_yes_no
-from ..utils.system import run_command, AptManager, cleanup_nvidia_repos, cleanup_old_nvidia_drivers, full_nvidia_cleanup, check_internet, get_os_info, check_nvidia_gpu, detect_gpu_vendors
+from ..utils.system import (
+    run_command, AptManager, cleanup_nvidia_repos, full_nvidia_cleanup,
+    check_internet, get_os_info, get_kernel_release, check_nvidia_gpu, detect_gpu_vendors,
+    scan_pci_display_devices, pci_device_name, PCI_VENDOR_IDS, dpkg_has_file_list,
+)
 
 _ACKNOWLEDGED_MARKER = "/var/lib/nvidia-setup/.acknowledged"
-
-
-def get_system_info():
-    """Gather comprehensive system information"""
-    info = {
-        'os': {},
-        'kernel': None,
-        'gpu': {},
-        'gpu_vendors': [],
-        'gpus': [],
-        'capabilities': {
-            'vulkan_supported': False,
-            'nvenc_supported': False,
-            'nvdec_supported': False,
-            'cuda_supported': False,
-            'qsv_supported': False,
-        }
-    }
+# Set once the marker has been checked (or the note shown) in this process
+_performance_note_done = False
+_PERFORMANCE_KERNEL_PARAMS = ("pcie_port_pm=off", "pcie_aspm.policy=performance")
+
+# GPU model names from `lspci` display-controller lines
+_NVIDIA_MODEL_RE = re.compile(r'NVIDIA Corporation (.+?)(?:\s*\(rev|$)', re.IGNORECASE)
+_INTEL_MODEL_RE = re.compile(r'Intel Corporation (.+?)(?:\s*\(rev|$)', re.IGNORECASE)
+_AMD_MODEL_RE = re.compile(r'(?:AMD|ATI)[^:]*?(?:Corporation\s+)?(.+?)(?:\s*\(rev|$)', re.IGNORECASE)
+# (lower-case substring, vendor, model pattern) tried in order on lspci lines
+_LSPCI_VENDOR_TABLE = (
+    ('nvidia', 'nvidia', _NVIDIA_MODEL_RE),
+    ('intel', 'intel', _INTEL_MODEL_RE),
+    ('amd', 'amd', _AMD_MODEL_RE),
+    ('radeon', 'amd', _AMD_MODEL_RE),
+)
+# Lower-case lspci class names that identify a display controller
+_LSPCI_DISPLAY_CLASSES = ("vga", "3d", "display")
+
+# Minimum compute capability (major, minor) of each NVIDIA architecture, ascending
+_ARCH_TABLE = (
+    ((3, 0), "Kepler (GTX 6xx/7xx series)"),
+    ((5, 0), "Maxwell (GTX 9xx series)"),
+    ((6, 0), "Pascal (GTX 10 series)"),
+    ((7, 0), "Volta"),
+    ((7, 5), "Turing (RTX 20/GTX 16 series)"),
+    ((8, 0), "Ampere (RTX 30 series)"),
+    ((8, 9), "Ada Lovelace (RTX 40 series)"),
+    ((10, 0), "Blackwell (RTX 50 series)"),
+)
+_ARCH_THRESHOLDS = tuple(threshold for threshold, _ in _ARCH_TABLE)
+_ARCH_NAMES = tuple(name for _, name in _ARCH_TABLE)
+# Minimum compute capability for Vulkan compute (Maxwell) and NVENC/NVDEC (Kepler)
+_VULKAN_MIN_CC = (5, 0)
+_NVCODEC_MIN_CC = (3, 0)
+
+# Vulkan loader and the directories it is installed into
+_LIBVULKAN = "libvulkan.so.1"
+_LIBVULKAN_DIRS = (
+    "/usr/lib/x86_64-linux-gnu",
+    "/usr/lib/aarch64-linux-gnu",
+    "/usr/lib64",
+    "/usr/lib",
+    "/usr/local/lib",
+)
+
+# Version-named install directories under /opt/vulkan-sdk (e.g. "1.4.304.0")
+_VULKAN_SDK_VERSION_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
+# `nvcc --version` release line (e.g. "release 12.4, V12.4.131")
+_NVCC_RELEASE_RE = re.compile(r"release\s+([\d.]+)")
+_CUDA_NVCC = "/usr/local/cuda/bin/nvcc"
+
+# Seconds before a hung nvidia-smi / vulkaninfo / nvcc probe is killed
+# (broken or mismatched drivers can make them block indefinitely)
+_PROBE_TIMEOUT = 5
+
+# Lower-case substrings that mark nvidia-smi output as an error message
+_SMI_ERROR_INDICATORS = ("command not found", "failed", "mismatch", "nvml")
+_SMI_DRIVER_ERROR_INDICATORS = (
+    "command not found",
+    "failed to initialize nvml",
+    "driver/library version mismatch",
+)
+
+# Series token (e.g. "rtx 40" from "rtx 4090") -> guidance shown for that series
+_GPU_SERIES_RE = re.compile(r"\b(rtx|gtx)\s*(50|40|30|20|16)")
+_MODERN_GPU_GUIDANCE = (
+    "\u2713 Modern GPU detected - excellent performance expected",
+    "  \u2192 Full support for AV1, H.265/HEVC, H.264/AVC",
+)
+_TURING_GPU_GUIDANCE = (
+    "\u2713 Good GPU model - well-supported",
+    "  \u2192 Supports H.265/HEVC, H.264/AVC",
+)
+_GPU_GUIDANCE = {
+    "rtx 50": _MODERN_GPU_GUIDANCE,
+    "rtx 40": _MODERN_GPU_GUIDANCE,
+    "rtx 30": (
+        "\u2713 Very good GPU model - well-supported",
+        "  \u2192 Good support for H.265/HEVC, H.264/AVC",
+    ),
+    "rtx 20": _TURING_GPU_GUIDANCE,
+    "gtx 16": _TURING_GPU_GUIDANCE,
+}
+_DEFAULT_GPU_GUIDANCE = (
+    "\u2713 GPU detected - compatibility may vary",
+    "  \u2192 Check NVIDIA documentation for codec support",
+)
+
+
+@dataclass
+class OsInfo:
+    """Distribution details from /etc/os-release."""
+    name: str = 'Unknown'
+    version: str = 'Unknown'
+    pretty_name: str = 'Unknown OS'
+    codename: str = 'unknown'
+
+
+@dataclass
+class DetectedGpu:
+    """A display controller found on the PCI bus."""
+    vendor: str
+    model: str
+
+
+@dataclass
+class GpuDetails:
+    """Primary GPU model plus NVIDIA driver details when available."""
+    model: Optional[str] = None
+    name: Optional[str] = None
+    driver_version: Optional[str] = None
+    compute_capability: Optional[str] = None
+    architecture: Optional[str] = None
+    driver_note: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Capabilities:
+    """Hardware features usable for media processing."""
+    vulkan_supported: bool = False
+    nvenc_supported: bool = False
+    nvdec_supported: bool = False
+    cuda_supported: bool = False
+    qsv_supported: bool = False
+
+
+@dataclass
+class SystemInfo:
+    """Everything shown in the system information report."""
+    os: OsInfo = field(default_factory=OsInfo)
+    kernel: str = "Unknown"
+    gpu: GpuDetails = field(default_factory=GpuDetails)
+    gpu_vendors: list[str] = field(default_factory=list)
+    gpus: list[DetectedGpu] = field(default_factory=list)
+    capabilities: Capabilities = field(default_factory=Capabilities)
+
+    def to_dict(self):
+        """Return the information as nested dicts."""
+        return asdict(self)
+
+
+def get_system_info(os_info=None):
+    """Gather comprehensive system information
+
+    Args:
+        os_info: Parsed /etc/os-release fields; read via get_os_info() if omitted.
+    """
+    info = SystemInfo()
 
     # OS Information
-    os_info = get_os_info()
-    info['os'] = {
-        'name': os_info.get('NAME', 'Unknown'),
-        'version': os_info.get('VERSION_ID', 'Unknown'),
-        'pretty_name': os_info.get('PRETTY_NAME', 'Unknown OS'),
-        'codename': os_info.get('UBUNTU_CODENAME') or os_info.get('VERSION_CODENAME', 'unknown')
-    }
+    if os_info is None:
+        os_info = get_os_info()
+    info.os = OsInfo(
+        name=os_info.get('NAME', 'Unknown'),
+        version=os_info.get('VERSION_ID', 'Unknown'),
+        pretty_name=os_info.get('PRETTY_NAME', 'Unknown OS'),
+        codename=os_info.get('UBUNTU_CODENAME') or os_info.get('VERSION_CODENAME', 'unknown'),
+    )
 
     # Kernel version
-    try:
-        info['kernel'] = run_command("uname -r", capture_output=True, check=False)
-    except Exception:
-        info['kernel'] = "Unknown"
+    info.kernel = get_kernel_release() or "Unknown"
 
     # Detect GPU vendors
-    info['gpu_vendors'] = detect_gpu_vendors()
+    info.gpu_vendors = detect_gpu_vendors()
 
-    # GPU Information from lspci (all vendors)
+    # GPU Information from sysfs, or lspci without /sys/bus/pci (all vendors)
     try:
-        lspci_output = run_command("lspci | grep -iE 'vga|3d|display'", capture_output=True, check=False)
-        if lspci_output:
-            for line in lspci_output.strip().split('\n'):
-                gpu_entry: dict[str, str] = {}
-                line_lower = line.lower()
-
-                if 'nvidia' in line_lower:
-                    match = re.search(r'NVIDIA Corporation (.+?)(?:\s*\(rev|$)', line, re.IGNORECASE)
-                    gpu_entry['vendor'] = 'nvidia'
-                    gpu_entry['model'] = match.group(1).strip() if match else line.strip()
-                elif 'intel' in line_lower:
-                    match = re.search(r'Intel Corporation (.+?)(?:\s*\(rev|$)', line, re.IGNORECASE)
-                    gpu_entry['vendor'] = 'intel'
-                    gpu_entry['model'] = match.group(1).strip() if match else line.strip()
-                elif 'amd' in line_lower or 'radeon' in line_lower:
-                    match = re.search(r'(?:AMD|ATI)[^:]*?(?:Corporation\s+)?(.+?)(?:\s*\(rev|$)', line, re.IGNORECASE)
-                    gpu_entry['vendor'] = 'amd'
-                    gpu_entry['model'] = match.group(1).strip() if match else line.strip()
-                else:
-                    gpu_entry['vendor'] = 'unknown'
-                    gpu_entry['model'] = line.strip()
-
-                if gpu_entry:
-                    info['gpus'].append(gpu_entry)
-
-            # Set primary GPU model for backward compatibility
-            if info['gpus']:
-                info['gpu']['model'] = info['gpus'][0]['model']
+        pci_devices = scan_pci_display_devices()
+        if pci_devices is not None:
+            for vendor_id, device_id in pci_devices:
+                info.gpus.append(DetectedGpu(
+                    vendor=PCI_VENDOR_IDS.get(vendor_id, 'unknown'),
+                    model=(pci_device_name(vendor_id, device_id)
+                           or f"PCI device {vendor_id}:{device_id}"),
+                ))
+        else:
+            info.gpus = _lspci_gpu_entries()
+
+        # Set primary GPU model for backward compatibility
+        if info.gpus:
+            info.gpu.model = info.gpus[0].model
 
     except Exception as e:
-        info['gpu']['error'] = str(e)
+        info.gpu.error = str(e)
 
-    # NVIDIA-specific details from nvidia-smi
-    if 'nvidia' in info['gpu_vendors']:
+    # NVIDIA-specific details from NVML (nvidia-smi if libnvidia-ml is absent)
+    if 'nvidia' in info.gpu_vendors:
         try:
-            nvidia_smi_output = run_command(
-                "nvidia-smi --query-gpu=gpu_name,driver_version,compute_cap --format=csv,noheader",
-                capture_output=True, check=False,
-            )
-            _error_indicators = ["command not found", "failed", "mismatch", "nvml"]
-            if (nvidia_smi_output
-                    and not any(err in nvidia_smi_output.lower() for err in _error_indicators)
-                    and ',' in nvidia_smi_output):
-                parts = nvidia_smi_output.split(',')
-                if len(parts) >= 1:
-                    info['gpu']['name'] = parts[0].strip()
-                if len(parts) >= 2:
-                    info['gpu']['driver_version'] = parts[1].strip()
-                if len(parts) >= 3:
-                    info['gpu']['compute_capability'] = parts[2].strip()
-
+            gpu = nvml.query_gpu()
+            if gpu is not None:
+                info.gpu.name = gpu.name
+                info.gpu.driver_version = gpu.driver_version
+                info.gpu.compute_capability = gpu.compute_capability
                 _determine_gpu_capabilities(info)
-            elif nvidia_smi_output and "mismatch" in nvidia_smi_output.lower():
-                info['gpu']['driver_note'] = "Driver/library mismatch - reboot required"
+            else:
+                _read_nvidia_smi_details(info)
+        except nvml.NvmlError as exc:
+            if exc.code == nvml.NVML_ERROR_LIB_RM_VERSION_MISMATCH:
+                info.gpu.driver_note = "Driver/library mismatch - reboot required"
         except Exception:
             pass
 
     # Intel-specific capabilities
-    if 'intel' in info['gpu_vendors']:
-        info['capabilities']['vulkan_supported'] = True
-        info['capabilities']['qsv_supported'] = True
+    if 'intel' in info.gpu_vendors:
+        info.capabilities.vulkan_supported = True
+        info.capabilities.qsv_supported = True
 
     # AMD-specific capabilities
-    if 'amd' in info['gpu_vendors']:
-        info['capabilities']['vulkan_supported'] = True
+    if 'amd' in info.gpu_vendors:
+        info.capabilities.vulkan_supported = True
 
     return info
 
 
+def _lspci_gpu_entries():
+    """Parse GPU vendor/model entries from lspci (fallback when sysfs is unavailable)"""
+    gpus = []
+    # Filter lspci's lines here rather than through a shell and grep
+    try:
+        proc = subprocess.Popen(["lspci"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return gpus
+
+    with proc:
+        for line in proc.stdout:
+            line_lower = line.lower()
+            if any(cls in line_lower for cls in _LSPCI_DISPLAY_CLASSES):
+                gpus.append(_lspci_gpu_entry(line, line_lower))
+
+    return gpus
+
+
+def _lspci_gpu_entry(line, line_lower):
+    """Return the vendor/model entry for one lspci display-controller line"""
+    for needle, vendor, model_re in _LSPCI_VENDOR_TABLE:
+        if needle in line_lower:
+            match = model_re.search(line)
+            return DetectedGpu(vendor=vendor, model=match.group(1).strip() if match else line.strip())
+    return DetectedGpu(vendor='unknown', model=line.strip())
+
+
+@functools.lru_cache(maxsize=1)
+def _nvidia_smi_query():
+    """Return nvidia-smi's "name, driver, compute cap" line for the first GPU.
+
+    On failure this is nvidia-smi's error text (or ""), which callers
+    check against the error indicators.  Every nvidia-smi fallback reads
+    this one cached fork; invalidate_gpu_query_cache() clears it once an
+    action may have changed the driver.
+    """
+    try:
+        output = run_command(
+            ["nvidia-smi", "--query-gpu=gpu_name,driver_version,compute_cap", "--format=csv,noheader"],
+            shell=False, capture_output=True, check=False, timeout=_PROBE_TIMEOUT,
+        )
+    except OSError:
+        return ""  # nvidia-smi not installed
+    return output.splitlines()[0] if output else ""
+
+
+def _read_nvidia_smi_details(info):
+    """Fill NVIDIA GPU details from nvidia-smi (fallback when NVML is unavailable)"""
+    nvidia_smi_output = _nvidia_smi_query()
+    output_lower = nvidia_smi_output.lower() if nvidia_smi_output else ""
+    if (nvidia_smi_output
+            and not any(err in output_lower for err in _SMI_ERROR_INDICATORS)
+            and ',' in nvidia_smi_output):
+        name, _, rest = nvidia_smi_output.partition(',')
+        driver, _, compute = rest.partition(',')
+        info.gpu.name = name.strip()
+        info.gpu.driver_version = driver.strip()
+        if compute:
+            info.gpu.compute_capability = compute.strip()
+
+        _determine_gpu_capabilities(info)
+    elif "mismatch" in output_lower:
+        info.gpu.driver_note = "Driver/library mismatch - reboot required"
+
+
 def _determine_gpu_capabilities(info):
     """Determine GPU capabilities based on compute capability and architecture"""
-    compute_cap = info['gpu'].get('compute_capability', '')
-    gpu_name = info['gpu'].get('name', '').lower()
+    compute_cap = info.gpu.compute_capability
+    caps = info.capabilities
 
-    # Parse compute capability (e.g., "8.6" -> 8.6)
+    # Parse compute capability as integers (e.g., "8.6" -> (8, 6)); a float
+    # would read a future "8.10" as 8.1
+    major, _, minor = (compute_cap or "").partition('.')
     try:
-        if compute_cap:
-            major, minor = compute_cap.split('.')
-            cc_value = float(f"{major}.{minor}")
-        else:
-            cc_value = 0
-    except:
-        cc_value = 0
+        cc_value = (int(major), int(minor or 0))
+    except ValueError:
+        cc_value = (0, 0)
 
     # Vulkan support: Kepler (3.0) and newer
     # Actually Vulkan requires Maxwell Gen 2 (5.0) or newer for full support
-    info['capabilities']['vulkan_supported'] = cc_value >= 5.0
+    caps.vulkan_supported = cc_value >= _VULKAN_MIN_CC
 
     # CUDA support: All NVIDIA GPUs with drivers
-    info['capabilities']['cuda_supported'] = cc_value > 0
+    caps.cuda_supported = cc_value > (0, 0)
 
     # NVENC support varies by GPU
     # - Kepler (6xx, 7xx) - limited NVENC
     # - Maxwell and newer - good NVENC
     # - Turing and newer - excellent NVENC with more codecs
-    info['capabilities']['nvenc_supported'] = cc_value >= 3.0
-
-    # NVDEC support
-    info['capabilities']['nvdec_supported'] = cc_value >= 3.0
-
-    # Architecture name
-    if cc_value >= 10.0:
-        info['gpu']['architecture'] = "Blackwell (RTX 50 series)"
-    elif cc_value >= 8.9:
-        info['gpu']['architecture'] = "Ada Lovelace (RTX 40 series)"
-    elif cc_value >= 8.0:
-        info['gpu']['architecture'] = "Ampere (RTX 30 series)"
-    elif cc_value >= 7.5:
-        info['gpu']['architecture'] = "Turing (RTX 20/GTX 16 series)"
-    elif cc_value >= 7.0:
-        info['gpu']['architecture'] = "Volta"
-    elif cc_value >= 6.0:
-        info['gpu']['architecture'] = "Pascal (GTX 10 series)"
-    elif cc_value >= 5.0:
-        info['gpu']['architecture'] = "Maxwell (GTX 9xx series)"
-    elif cc_value >= 3.0:
-        info['gpu']['architecture'] = "Kepler (GTX 6xx/7xx series)"
-        info['capabilities']['vulkan_supported'] = False  # Limited Vulkan on Kepler
-    else:
-        info['gpu']['architecture'] = "Unknown/Legacy"
+    # NVDEC arrived in the same generation
+    caps.nvenc_supported = caps.nvdec_supported = cc_value >= _NVCODEC_MIN_CC
+
+    # Architecture name: last table entry whose threshold is <= cc_value
+    idx = bisect.bisect_right(_ARCH_THRESHOLDS, cc_value) - 1
+    info.gpu.architecture = _ARCH_NAMES[idx] if idx >= 0 else "Unknown/Legacy"
 
 
 def display_system_info(info):
     """Display system information in a formatted way"""
-    print("\n" + "=" * 60)
-    print("                    SYSTEM INFORMATION")
-    print("=" * 60)
+    # Collect the report and write it in one call rather than ~20 prints
+    lines = [
+        "\n" + "=" * 60,
+        "                    SYSTEM INFORMATION",
+        "=" * 60,
+    ]
+    add = lines.append
 
     # OS Info
-    print(f"\n  Operating System: {info['os']['pretty_name']}")
-    print(f"  Kernel:           {info['kernel']}")
+    add(f"\n  Operating System: {info.os.pretty_name}")
+    add(f"  Kernel:           {info.kernel}")
 
     # GPU Info — show all detected GPUs
-    gpus = info.get('gpus', [])
+    gpus = info.gpus
     if gpus:
         for i, gpu in enumerate(gpus):
             label = "GPU" if len(gpus) == 1 else f"GPU {i + 1}"
-            vendor_tag = gpu['vendor'].upper()
-            print(f"\n  {label}:            [{vendor_tag}] {gpu['model']}")
-    elif info['gpu'].get('model'):
-        print(f"\n  GPU Model:        {info['gpu']['model']}")
+            vendor_tag = gpu.vendor.upper()
+            add(f"\n  {label}:            [{vendor_tag}] {gpu.model}")
+    elif info.gpu.model:
+        add(f"\n  GPU Model:        {info.gpu.model}")
 
     # NVIDIA-specific details (from nvidia-smi)
-    if info['gpu'].get('architecture'):
-        print(f"  Architecture:     {info['gpu']['architecture']}")
-    if info['gpu'].get('compute_capability'):
-        print(f"  Compute Cap:      {info['gpu']['compute_capability']}")
-    if info['gpu'].get('driver_version'):
-        print(f"  NVIDIA Driver:    {info['gpu']['driver_version']}")
-    if info['gpu'].get('driver_note'):
-        print(f"  Driver Status:    {info['gpu']['driver_note']}")
-
-    if not gpus and not info['gpu'].get('model'):
-        if info['gpu'].get('driver_note'):
-            print(f"\n  GPU:              Detected (via lspci)")
-            print(f"  Driver Status:    {info['gpu']['driver_note']}")
+    if info.gpu.architecture:
+        add(f"  Architecture:     {info.gpu.architecture}")
+    if info.gpu.compute_capability:
+        add(f"  Compute Cap:      {info.gpu.compute_capability}")
+    if info.gpu.driver_version:
+        add(f"  NVIDIA Driver:    {info.gpu.driver_version}")
+    if info.gpu.driver_note:
+        add(f"  Driver Status:    {info.gpu.driver_note}")
+
+    if not gpus and not info.gpu.model:
+        if info.gpu.driver_note:
+            add(f"\n  GPU:              Detected (via PCI scan)")
+            add(f"  Driver Status:    {info.gpu.driver_note}")
         else:
-            print("\n  GPU:              Not detected or driver not loaded")
+            add("\n  GPU:              Not detected or driver not loaded")
 
     # Capabilities
-    caps = info['capabilities']
-    vendors = info.get('gpu_vendors', [])
-    print("\n  Hardware Capabilities:")
-    print(f"    Vulkan:  {'[OK] Supported' if caps['vulkan_supported'] else '[--] Not available'}")
+    caps = info.capabilities
+    vendors = info.gpu_vendors
+    add("\n  Hardware Capabilities:")
+    add(f"    Vulkan:  {'[OK] Supported' if caps.vulkan_supported else '[--] Not available'}")
     if 'nvidia' in vendors:
-        print(f"    CUDA:    {'[OK] Supported' if caps['cuda_supported'] else '[--] Not available'}")
-        print(f"    NVENC:   {'[OK] Supported' if caps['nvenc_supported'] else '[--] Not available'}")
-        print(f"    NVDEC:   {'[OK] Supported' if caps['nvdec_supported'] else '[--] Not available'}")
+        add(f"    CUDA:    {'[OK] Supported' if caps.cuda_supported else '[--] Not available'}")
+        add(f"    NVENC:   {'[OK] Supported' if caps.nvenc_supported else '[--] Not available'}")
+        add(f"    NVDEC:   {'[OK] Supported' if caps.nvdec_supported else '[--] Not available'}")
     if 'intel' in vendors:
-        print(f"    QSV:     {'[OK] Supported' if caps['qsv_supported'] else '[--] Not available'}")
+        add(f"    QSV:     {'[OK] Supported' if caps.qsv_supported else '[--] Not available'}")
 
     # Warnings/Notes
-    if not caps['vulkan_supported'] and info['gpu'].get('compute_capability'):
-        print("\n  Note: Vulkan GPU compute requires Maxwell architecture or newer for NVIDIA.")
+    if not caps.vulkan_supported and info.gpu.compute_capability:
+        add("\n  Note: Vulkan GPU compute requires Maxwell architecture or newer for NVIDIA.")
 
-    print("\n" + "=" * 60)
+    add("\n" + "=" * 60)
 
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def run_preliminary_checks():
+
+def run_preliminary_checks(os_info=None):
     """Run all preliminary system checks.
 
     Only performs fast, essential gates before showing the menu:
     GPU present, OS version, dependencies, and internet.
     Performance recommendations are shown once (marker file).
     Cleanup/audit is available as a menu item.
+
+    Args:
+        os_info: Parsed /etc/os-release fields; read via get_os_info() if omitted.
     """
     log_step("Running preliminary system checks...")
 
+    if os_info is None:
+        os_info = get_os_info()
     _show_performance_note_once()
     _check_gpu_present()
-    _check_ubuntu_version()
+    _check_ubuntu_version(os_info)
     _install_dependencies()
     _check_internet_connectivity()
 
 
 def _show_performance_note_once():
     """Show NVIDIA performance recommendations once, then remember via marker file."""
+    global _performance_note_done
+    if _performance_note_done:
+        return
+    _performance_note_done = True
     if os.path.exists(_ACKNOWLEDGED_MARKER):
         return
 
+    # Already booted with the recommended flags: nothing to suggest, and
+    # no marker so the tip returns if they are later removed from GRUB
+    try:
+        with open("/proc/cmdline") as fh:
+            cmdline = fh.read().split()
+    except OSError:
+        cmdline = []
+    if all(param in cmdline for param in _PERFORMANCE_KERNEL_PARAMS):
+        return
+
     log_info("Tip: For optimal GPU performance, add kernel parameters:")
-    log_info("  pcie_port_pm=off  pcie_aspm.policy=performance")
+    log_info("  " + "  ".join(_PERFORMANCE_KERNEL_PARAMS))
     log_info("  (Add to GRUB_CMDLINE_LINUX_DEFAULT in /etc/default/grub, then update-grub)")
 
     try:
         os.makedirs(os.path.dirname(_ACKNOWLEDGED_MARKER), exist_ok=True)
-        with open(_ACKNOWLEDGED_MARKER, "w") as fh:
-            fh.write("acknowledged\n")
+        fd = os.open(_ACKNOWLEDGED_MARKER, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, b"acknowledged\n")
+        finally:
+            os.close(fd)
     except OSError:
         pass  # Non-critical, will just show again next time
 
@@ -290,11 +483,10 @@ def _offer_cleanup_option():
             cleanup_nvidia_repos()
 
 
-def _check_ubuntu_version():
-    """Check Ubuntu version compatibility"""
+def _check_ubuntu_version(os_info):
+    """Check Ubuntu version compatibility against parsed /etc/os-release fields"""
     SUPPORTED_VERSIONS = ["22.04", "24.04"]
 
-    os_info = get_os_info()
     detected_name = os_info.get('NAME', '')
     detected_version = os_info.get('VERSION_ID', '')
     pretty_name = os_info.get('PRETTY_NAME', 'Unknown OS')
@@ -328,22 +520,16 @@ def _install_dependencies():
         "wget", "git", "python3-pip",
     ]
 
-    # Fast check: see if all packages are already installed
-    missing: list[str] = []
-    for pkg in dependencies:
-        result = run_command(f"dpkg -s {pkg} 2>/dev/null | grep -q 'Status: install ok installed'",
-                            capture_output=True, check=False)
-        # run_command returns output; for shell one-liners we check return code via the output
-        check = run_command(f"dpkg -s {pkg}", capture_output=True, check=False)
-        if not check or "install ok installed" not in check:
-            missing.append(pkg)
+    # Fast check: one dpkg-query for the whole list
+    apt = AptManager()
+    installed = apt.installed(*dependencies)
+    missing = [pkg for pkg in dependencies if pkg not in installed]
 
     if not missing:
         log_info("\u2713 All dependencies present")
         return
 
     log_info(f"Installing missing dependencies: {', '.join(missing)}")
-    apt = AptManager()
     apt.install(*missing)
     log_info("\u2713 Dependencies installed")
 
@@ -358,158 +544,216 @@ def _check_internet_connectivity():
         log_info("\u2713 Internet connectivity verified")
 
 
-def detect_existing_installations():
-    """Detect what's already installed on the system"""
-    installations = {
-        'nvidia_driver': {'installed': False, 'version': None},
-        'docker': {'installed': False, 'version': None},
-        'nvidia_runtime': {'installed': False, 'version': None},
-        'vulkan': {'installed': False, 'version': None},
-        'vulkan_sdk': {'installed': False, 'version': None},
-        'cuda_toolkit': {'installed': False, 'version': None},
-    }
+def _not_installed():
+    return {'installed': False, 'version': None}
+
+
+def _installed(version):
+    return {'installed': True, 'version': version}
+
 
-    # Check NVIDIA driver
+def _probe_nvidia_driver():
+    """NVIDIA driver (NVML in-process, nvidia-smi if libnvidia-ml is absent)"""
     try:
-        nvidia_version = run_command("nvidia-smi --query-gpu=driver_version --format=csv,noheader",
-                                   capture_output=True, check=False)
-        error_indicators = [
-            "command not found",
-            "failed to initialize nvml",
-            "driver/library version mismatch",
-        ]
-        if nvidia_version and not any(err in nvidia_version.lower() for err in error_indicators):
-            installations['nvidia_driver']['installed'] = True
-            installations['nvidia_driver']['version'] = nvidia_version.strip()
+        nvidia_version = nvml.get_driver_version()
+        if nvidia_version is None:
+            smi_output = _nvidia_smi_query()
+            smi_lower = smi_output.lower()
+            if any(err in smi_lower for err in _SMI_DRIVER_ERROR_INDICATORS):
+                nvidia_version = None
+            else:
+                nvidia_version = smi_output.split(',')[1] if ',' in smi_output else None
+        if nvidia_version:
+            return _installed(nvidia_version.strip())
     except Exception:
         pass
+    return _not_installed()
 
-    # Check Docker
+
+def _probe_docker():
+    """Docker engine"""
+    docker = shutil.which("docker")
+    if not docker:
+        return _not_installed()
     try:
-        docker_version = run_command("docker --version", capture_output=True, check=False)
+        docker_version = run_command([docker, "--version"], shell=False, capture_output=True,
+                                     check=False, timeout=_PROBE_TIMEOUT)
         if docker_version and "Docker version" in docker_version:
-            installations['docker']['installed'] = True
             # Extract version number (e.g., "Docker version 24.0.6" -> "24.0.6")
-            version_part = docker_version.split("Docker version")[1].split(",")[0].strip()
-            installations['docker']['version'] = version_part
-    except:
+            return _installed(docker_version.split("Docker version")[1].split(",")[0].strip())
+    except Exception:
         pass
+    return _not_installed()
 
-    # Check NVIDIA Container Runtime
-    try:
-        # Check if nvidia runtime is configured in docker
-        daemon_config = "/etc/docker/daemon.json"
-        if os.path.exists(daemon_config):
-            with open(daemon_config, 'r') as f:
-                content = f.read()
-                if 'nvidia' in content.lower():
-                    installations['nvidia_runtime']['installed'] = True
-                    installations['nvidia_runtime']['version'] = "Configured"
-    except:
-        pass
 
-    # Check Vulkan
+def _probe_nvidia_runtime():
+    """NVIDIA Container Runtime configured in docker"""
+    try:
+        with open("/etc/docker/daemon.json", 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return _not_installed()
+    if not isinstance(data, dict):
+        return _not_installed()
+    runtimes = data.get('runtimes')
+    if (isinstance(runtimes, dict) and 'nvidia' in runtimes) or data.get('default-runtime') == 'nvidia':
+        return _installed("Configured")
+    return _not_installed()
+
+
+def _libvulkan_present():
+    """Whether the Vulkan loader library exists in a system or LD_LIBRARY_PATH dir"""
+    lib_dirs = list(_LIBVULKAN_DIRS)
+    lib_dirs.extend(d for d in os.environ.get("LD_LIBRARY_PATH", "").split(os.pathsep) if d)
+    return any(os.path.exists(os.path.join(d, _LIBVULKAN)) for d in lib_dirs)
+
+
+def _probe_vulkan():
+    """Vulkan runtime, labelled by the device vulkaninfo reports"""
+    # vulkaninfo loads every ICD and enumerates devices; skip it when it cannot work
+    if not _libvulkan_present() or not shutil.which("vulkaninfo"):
+        return _not_installed()
     try:
-        vulkan_output = run_command("vulkaninfo --summary 2>&1", capture_output=True, check=False)
+        vulkan_output = run_command(["vulkaninfo", "--summary"], shell=False, capture_output=True,
+                                    check=False, timeout=_PROBE_TIMEOUT)
         if vulkan_output:
+            vulkan_lower = vulkan_output.lower()
             if "NVIDIA" in vulkan_output:
-                installations['vulkan']['installed'] = True
-                installations['vulkan']['version'] = "NVIDIA GPU"
+                return _installed("NVIDIA GPU")
             elif "Intel" in vulkan_output:
-                installations['vulkan']['installed'] = True
-                installations['vulkan']['version'] = "Intel GPU"
-            elif "RADV" in vulkan_output or "AMD" in vulkan_output.upper():
-                installations['vulkan']['installed'] = True
-                installations['vulkan']['version'] = "AMD GPU"
-            elif "llvmpipe" in vulkan_output.lower():
-                installations['vulkan']['installed'] = True
-                installations['vulkan']['version'] = "Software only"
+                return _installed("Intel GPU")
+            elif "RADV" in vulkan_output or "amd" in vulkan_lower:
+                return _installed("AMD GPU")
+            elif "llvmpipe" in vulkan_lower:
+                return _installed("Software only")
             elif "Vulkan Instance Version" in vulkan_output:
-                installations['vulkan']['installed'] = True
-                installations['vulkan']['version'] = "Available"
+                return _installed("Available")
     except Exception:
         pass
+    return _not_installed()
+
 
-    # Check Vulkan SDK (LunarG development SDK)
+def _probe_vulkan_sdk():
+    """Vulkan SDK (LunarG development SDK)"""
     # 1. Tarball install at /opt/vulkan-sdk/ (current method)
     _vulkan_sdk_base = "/opt/vulkan-sdk"
     _vulkan_current = os.path.join(_vulkan_sdk_base, "current")
-    if os.path.islink(_vulkan_current):
+    # readlink/scandir fail with OSError when the paths are absent
+    try:
         target = os.path.basename(os.readlink(_vulkan_current))
-        if re.match(r"\d+\.\d+\.\d+", target):
-            installations['vulkan_sdk']['installed'] = True
-            installations['vulkan_sdk']['version'] = target
-    if not installations['vulkan_sdk']['installed'] and os.path.isdir(_vulkan_sdk_base):
-        try:
-            dirs = [
-                e.name for e in os.scandir(_vulkan_sdk_base)
-                if e.is_dir() and re.match(r"\d+\.\d+\.\d+", e.name)
-            ]
-            if dirs:
-                dirs.sort(key=lambda v: [int(x) for x in v.split(".")[:3]], reverse=True)
-                installations['vulkan_sdk']['installed'] = True
-                installations['vulkan_sdk']['version'] = dirs[0]
-        except OSError:
-            pass
-    # 2. Legacy APT install
-    if not installations['vulkan_sdk']['installed']:
+    except OSError:
+        target = ""
+    if _VULKAN_SDK_VERSION_RE.match(target):
+        return _installed(target)
+    try:
+        # Single pass keeping only the newest version directory
+        newest = max(
+            (
+                (tuple(map(int, m.groups())), e.name)
+                for e in os.scandir(_vulkan_sdk_base)
+                if e.is_dir() and (m := _VULKAN_SDK_VERSION_RE.match(e.name))
+            ),
+            default=None,
+        )
+        if newest:
+            return _installed(newest[1])
+    except OSError:
+        pass
+    # 2. Legacy APT install; only query dpkg when it has the package
+    if dpkg_has_file_list("vulkan-sdk"):
         try:
             sdk_output = run_command(
-                "dpkg -s vulkan-sdk 2>/dev/null | grep '^Version:'",
-                capture_output=True, check=False,
+                ["dpkg-query", "-W", "-f=${Status}\t${Version}", "vulkan-sdk"],
+                shell=False, capture_output=True, check=False,
             )
-            if sdk_output and "Version:" in sdk_output:
-                installations['vulkan_sdk']['installed'] = True
-                installations['vulkan_sdk']['version'] = sdk_output.split("Version:")[1].strip()
+            status, _, version = (sdk_output or "").partition("\t")
+            if status == "install ok installed" and version:
+                return _installed(version)
         except Exception:
             pass
     # 3. VULKAN_SDK environment variable
-    if not installations['vulkan_sdk']['installed']:
-        sdk_path = os.environ.get("VULKAN_SDK")
-        if sdk_path and os.path.isdir(sdk_path):
-            installations['vulkan_sdk']['installed'] = True
-            installations['vulkan_sdk']['version'] = "Installed"
-
-    # Check CUDA Toolkit (host nvcc)
-    # 1. Try nvcc on PATH
-    try:
-        nvcc_output = run_command("nvcc --version 2>/dev/null", capture_output=True, check=False)
-        if nvcc_output and "release" in nvcc_output.lower():
-            match = re.search(r"release\s+([\d.]+)", nvcc_output)
-            if match:
-                installations['cuda_toolkit']['installed'] = True
-                installations['cuda_toolkit']['version'] = match.group(1)
-    except Exception:
-        pass
-    # 2. Fallback: nvcc may not be on PATH yet (profile.d not sourced)
-    if not installations['cuda_toolkit']['installed']:
+    sdk_path = os.environ.get("VULKAN_SDK")
+    if sdk_path and os.path.isdir(sdk_path):
+        return _installed("Installed")
+    return _not_installed()
+
+
+def _probe_cuda_toolkit():
+    """CUDA Toolkit (version.json, else host nvcc)"""
+    # 1. version.json in /usr/local/cuda: a file read, no fork
+    version_json = "/usr/local/cuda/version.json"
+    if os.path.exists(version_json):
         try:
-            nvcc_output = run_command(
-                "/usr/local/cuda/bin/nvcc --version 2>/dev/null",
-                capture_output=True, check=False,
-            )
+            with open(version_json, "r") as fh:
+                data = json.load(fh)
+            ver = data.get("cuda", {}).get("version")
+            if ver:
+                return _installed(ver)
+        except Exception:
+            pass
+    # 2. nvcc on PATH
+    # 3. Fallback: nvcc may not be on PATH yet (profile.d not sourced)
+    # Only fork nvcc once it is known to exist
+    for nvcc in (shutil.which("nvcc"), _CUDA_NVCC):
+        if not nvcc or not os.access(nvcc, os.X_OK):
+            continue
+        try:
+            nvcc_output = run_command([nvcc, "--version"], shell=False, capture_output=True,
+                                      check=False, timeout=_PROBE_TIMEOUT)
             if nvcc_output and "release" in nvcc_output.lower():
-                match = re.search(r"release\s+([\d.]+)", nvcc_output)
+                match = _NVCC_RELEASE_RE.search(nvcc_output)
                 if match:
-                    installations['cuda_toolkit']['installed'] = True
-                    installations['cuda_toolkit']['version'] = match.group(1)
+                    return _installed(match.group(1))
         except Exception:
             pass
-    # 3. Fallback: version.json in /usr/local/cuda
-    if not installations['cuda_toolkit']['installed']:
-        import json as _json
-        version_json = "/usr/local/cuda/version.json"
-        if os.path.exists(version_json):
-            try:
-                with open(version_json, "r") as fh:
-                    data = _json.load(fh)
-                ver = data.get("cuda", {}).get("version")
-                if ver:
-                    installations['cuda_toolkit']['installed'] = True
-                    installations['cuda_toolkit']['version'] = ver
-            except Exception:
-                pass
+    return _not_installed()
+
+
+# Installation key -> probe; probes are independent and run concurrently
+_INSTALLATION_PROBES = {
+    'nvidia_driver': _probe_nvidia_driver,
+    'docker': _probe_docker,
+    'nvidia_runtime': _probe_nvidia_runtime,
+    'vulkan': _probe_vulkan,
+    'vulkan_sdk': _probe_vulkan_sdk,
+    'cuda_toolkit': _probe_cuda_toolkit,
+}
+# Probes that are only meaningful with an NVIDIA GPU present
+_NVIDIA_ONLY_PROBES = frozenset(('nvidia_driver', 'nvidia_runtime', 'cuda_toolkit'))
+
+
+def invalidate_gpu_query_cache():
+    """Forget cached nvidia-smi output after installing or removing components."""
+    _nvidia_smi_query.cache_clear()
+
+
+def detect_existing_installations(refresh=False):
+    """Detect what's already installed on the system
+
+    Each probe mostly waits on a subprocess, so they run in a thread pool
+    and the total time is that of the slowest probe rather than the sum.
+
+    Args:
+        refresh: Discard the cached nvidia-smi output (pass True after
+            installing or removing components).
+    """
+    if refresh:
+        invalidate_gpu_query_cache()
+
+    # Without an NVIDIA GPU, skip the NVIDIA probes (nvidia-smi, nvcc)
+    probes = _INSTALLATION_PROBES
+    if 'nvidia' not in detect_gpu_vendors():
+        probes = {key: probe for key, probe in probes.items() if key not in _NVIDIA_ONLY_PROBES}
 
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {key: executor.submit(probe) for key, probe in probes.items()}
+
+    installations = {key: _not_installed() for key in _INSTALLATION_PROBES}
+    for key, future in futures.items():
+        try:
+            installations[key] = future.result()
+        except Exception:
+            installations[key] = _not_installed()
     return installations
 
 
@@ -518,31 +762,35 @@ def check_gpu_capabilities():
     log_step("Checking GPU capabilities for media processing...")
 
     try:
-        # Get GPU model
-        gpu_model = run_command(
-            "nvidia-smi --query-gpu=gpu_name --format=csv,noheader",
-            capture_output=True
-        )
-        log_info(f"Detected GPU: {gpu_model}")
+        gpu = nvml.query_gpu()
+        if gpu is not None:
+            gpu_model = gpu.name
+            compute_cap = gpu.compute_capability
+            has_encoder = gpu.has_encoder
+            has_decoder = gpu.has_decoder
+        else:
+            # libnvidia-ml not loadable; ask nvidia-smi instead
+            csv = _nvidia_smi_query()
+            if csv.count(",") != 2:
+                raise RuntimeError(csv or "nvidia-smi returned no output")
+            gpu_model, _, compute_cap = (part.strip() for part in csv.split(","))
+            nvidia_info = run_command(["nvidia-smi", "-q"], shell=False,
+                                      capture_output=True, timeout=_PROBE_TIMEOUT)
+            has_encoder = "Encoder" in nvidia_info
+            has_decoder = "Decoder" in nvidia_info
 
-        # Get compute capability
-        compute_cap = run_command(
-            "nvidia-smi --query-gpu=compute_cap --format=csv,noheader",
-            capture_output=True
-        )
+        log_info(f"Detected GPU: {gpu_model}")
         log_info(f"GPU Architecture: Compute {compute_cap}")
 
         # Check NVENC/NVDEC support
-        nvidia_info = run_command("nvidia-smi -q", capture_output=True)
-
-        if "Encoder" in nvidia_info:
+        if has_encoder:
             log_info("\u2713 NVENC (GPU encoding) is supported")
             log_info("  \u2192 Compatible with FFmpeg GPU acceleration")
             log_info("  \u2192 Compatible with Plex GPU-accelerated encoding")
         else:
             log_warn("\u2717 NVENC not detected - GPU encoding may not be available")
 
-        if "Decoder" in nvidia_info:
+        if has_decoder:
             log_info("\u2713 NVDEC (GPU decoding) is supported")
             log_info("  \u2192 Compatible with FFmpeg GPU acceleration")
             log_info("  \u2192 Compatible with Plex GPU-accelerated decoding")
@@ -561,17 +809,7 @@ def _provide_gpu_guidance(gpu_model):
     if not gpu_model:
         return
 
-    gpu_lower = gpu_model.lower()
-
-    if any(x in gpu_lower for x in ["rtx 40", "rtx 50"]):
-        log_info("\u2713 Modern GPU detected - excellent performance expected")
-        log_info("  \u2192 Full support for AV1, H.265/HEVC, H.264/AVC")
-    elif "rtx 30" in gpu_lower:
-        log_info("\u2713 Very good GPU model - well-supported")
-        log_info("  \u2192 Good support for H.265/HEVC, H.264/AVC")
-    elif any(x in gpu_lower for x in ["rtx 20", "gtx 16"]):
-        log_info("\u2713 Good GPU model - well-supported")
-        log_info("  \u2192 Supports H.265/HEVC, H.264/AVC")
-    else:
-        log_info("\u2713 GPU detected - compatibility may vary")
-        log_info("  \u2192 Check NVIDIA documentation for codec support")
+    match = _GPU_SERIES_RE.search(gpu_model.lower())
+    series = f"{match[1]} {match[2]}" if match else None
+    for message in _GPU_GUIDANCE.get(series, _DEFAULT_GPU_GUIDANCE):
+        log_info(message)
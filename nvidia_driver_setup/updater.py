@@ -3,16 +3,43 @@
 Detects how the tool was installed (git clone vs pip) and updates accordingly.
 """
 
+import functools
+import json
 import os
+import re
 import subprocess
 import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
+from typing import Optional
 
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:
+    Version = None
+
+from .utils.http import http_get
 from .utils.logging import log_info, log_warn, log_error, log_step, log_success
 from .utils.prompts import prompt_yes_no
+from .utils.system import get_cache_dir, write_file_if_changed
 
 REPO_URL = "https://github.com/regix1/nvidia-driver-setup.git"
+PYPI_JSON_URL = "https://pypi.org/pypi/nvidia-driver-setup/json"
+_PYPI_TIMEOUT = 5
+# Seconds before a hung git probe in the update check is abandoned
+_GIT_TIMEOUT = 20
+# Latest PyPI version and its ETag; re-checked (conditionally) after the TTL
+_PYPI_CACHE_FILE = "pypi.json"
+_PYPI_CACHE_TTL = 60 * 60
+# Leading numeric release segment (e.g. "1.3.0" from "1.3.0.dev2")
+_RELEASE_RE = re.compile(r"\d+(?:\.\d+)*")
+
+# Set once origin has been checked (and fixed if needed) in this process
+_origin_verified = False
+# Update check started ahead of run_self_update by prefetch_update_check()
+_pending_check: Optional[Future] = None
 
 
 class InstallMethod(Enum):
@@ -22,11 +49,13 @@ class InstallMethod(Enum):
     UNKNOWN = "unknown"
 
 
+@functools.lru_cache(maxsize=1)
 def _get_project_root() -> Path:
     """Resolve the project root from this file's location."""
     return Path(__file__).resolve().parent.parent
 
 
+@functools.lru_cache(maxsize=1)
 def detect_install_method() -> InstallMethod:
     """Detect whether we were installed via git clone or pip."""
     project_root = _get_project_root()
@@ -37,47 +66,74 @@ def detect_install_method() -> InstallMethod:
 
 def _ensure_origin(cwd: str) -> None:
     """Ensure the git origin remote points to the canonical repo."""
+    global _origin_verified
+    if _origin_verified:
+        return
+
+    # Plain config read; `git remote get-url` also applies url rewrites
     result = subprocess.run(
-        ["git", "remote", "get-url", "origin"],
+        ["git", "config", "--get", "remote.origin.url"],
         cwd=cwd, capture_output=True, text=True,
     )
+    _origin_verified = True
     if result.returncode != 0:
         # No origin remote at all - add it
         subprocess.run(
             ["git", "remote", "add", "origin", REPO_URL],
-            cwd=cwd, capture_output=True, text=True,
+            cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
         )
     elif result.stdout.strip() != REPO_URL:
         subprocess.run(
             ["git", "remote", "set-url", "origin", REPO_URL],
-            cwd=cwd, capture_output=True, text=True,
+            cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
         )
 
 
 def _check_git_updates() -> tuple[bool, str]:
-    """Fetch from origin and check if there are new commits.
+    """Compare the canonical main tip with HEAD to check for new commits.
+
+    Read-only and bounded by _GIT_TIMEOUT, so it is safe to run in the
+    background: the remote is queried by URL rather than through origin,
+    which _perform_git_update() fixes up before pulling.
 
     Returns:
         (has_updates, summary) where summary is the commit log or a status message.
     """
-    project_root = _get_project_root()
-    cwd = str(project_root)
+    cwd = str(_get_project_root())
 
-    _ensure_origin(cwd)
+    def _git(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["git", *args], cwd=cwd, capture_output=True, text=True,
+            timeout=_GIT_TIMEOUT,
+        )
 
-    result = subprocess.run(
-        ["git", "fetch", "origin", "main"],
-        cwd=cwd, capture_output=True, text=True,
-    )
-    if result.returncode != 0:
-        return False, f"git fetch failed: {result.stderr.strip()}"
+    try:
+        # Only ask the remote for its tip; `git pull` fetches objects once
+        # the user has agreed to update
+        result = _git("ls-remote", REPO_URL, "refs/heads/main")
+        if result.returncode != 0:
+            return False, f"git ls-remote failed: {result.stderr.strip()}"
+
+        fields = result.stdout.split()
+        if not fields:
+            return False, "Remote branch main not found."
+        remote_sha = fields[0]
+
+        result = _git("rev-parse", "HEAD")
+        if result.returncode != 0:
+            return False, f"git rev-parse failed: {result.stderr.strip()}"
+        local_sha = result.stdout.strip()
+
+        if remote_sha == local_sha:
+            return False, "Already up to date."
+
+        # If the remote tip is already a local object the new commits can be listed
+        result = _git("log", f"HEAD..{remote_sha}", "--oneline")
+    except subprocess.TimeoutExpired as e:
+        return False, f"git {e.cmd[1]} timed out after {_GIT_TIMEOUT}s."
 
-    result = subprocess.run(
-        ["git", "log", "HEAD..origin/main", "--oneline"],
-        cwd=cwd, capture_output=True, text=True,
-    )
     if result.returncode != 0:
-        return False, f"git log failed: {result.stderr.strip()}"
+        return True, f"New commits on origin/main ({local_sha[:7]} -> {remote_sha[:7]})."
 
     commits = result.stdout.strip()
     if not commits:
@@ -87,6 +143,76 @@ def _check_git_updates() -> tuple[bool, str]:
     return True, f"{count} new commit(s):\n{commits}"
 
 
+def _latest_pypi_version() -> str:
+    """Return the newest release on PyPI via a small on-disk cache.
+
+    Asks the PyPI JSON API directly rather than starting pip for
+    ``pip index``.  A cached answer younger than an hour is used as is;
+    an older one is revalidated with ``If-None-Match`` so an unchanged
+    release costs a bodiless 304.
+
+    Raises:
+        OSError: On network failure.
+        ValueError, KeyError, TypeError: On an unexpected response.
+    """
+    try:
+        cache_path: Optional[str] = os.path.join(get_cache_dir(), _PYPI_CACHE_FILE)
+    except OSError:
+        cache_path = None
+
+    cached = None
+    headers = {"Accept": "application/json"}
+    if cache_path:
+        try:
+            age = time.time() - os.stat(cache_path).st_mtime
+            with open(cache_path, "r") as fh:
+                cached = json.load(fh)
+        except (OSError, ValueError):
+            cached = None
+        # Ignore a cache that does not hold a version string
+        if not isinstance(cached, dict) or not isinstance(cached.get("version"), str):
+            cached = None
+        elif age < _PYPI_CACHE_TTL:
+            return cached["version"]
+        elif isinstance(cached.get("etag"), str):
+            headers["If-None-Match"] = cached["etag"]
+
+    with http_get(PYPI_JSON_URL, headers=headers, timeout=_PYPI_TIMEOUT) as resp:
+        if resp.status == 304 and cached is not None:
+            resp.read()
+            latest, etag = cached["version"], cached.get("etag")
+        else:
+            latest = json.load(resp)["info"]["version"]
+            etag = resp.getheader("ETag")
+
+    if cache_path:
+        try:
+            write_file_if_changed(cache_path, json.dumps({"etag": etag, "version": latest}))
+            os.utime(cache_path)  # restart the TTL even if unchanged
+        except OSError:
+            pass
+    return latest
+
+
+def _is_newer(latest: str, current: str) -> bool:
+    """Return True if version ``latest`` sorts after ``current``.
+
+    Uses packaging's PEP 440 ordering when it is installed; otherwise
+    compares the numeric release segments as tuples of ints.
+    """
+    if Version is not None:
+        try:
+            return Version(latest) > Version(current)
+        except InvalidVersion:
+            pass
+
+    def _release(version: str) -> tuple[int, ...]:
+        match = _RELEASE_RE.match(version.strip().lstrip("vV"))
+        return tuple(map(int, match[0].split("."))) if match else ()
+
+    return _release(latest) > _release(current)
+
+
 def _check_pip_updates() -> tuple[bool, str]:
     """Check PyPI for a newer version of nvidia-driver-setup.
 
@@ -95,32 +221,54 @@ def _check_pip_updates() -> tuple[bool, str]:
     """
     from . import __version__ as current_version
 
-    result = subprocess.run(
-        [sys.executable, "-m", "pip", "index", "versions", "nvidia-driver-setup"],
-        capture_output=True, text=True,
-    )
-    if result.returncode != 0:
-        return False, f"pip index failed: {result.stderr.strip()}"
+    try:
+        latest = _latest_pypi_version()
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return False, f"PyPI query failed: {e}"
 
-    # Output format: "nvidia-driver-setup (X.Y.Z)"
-    output = result.stdout.strip()
-    for line in output.splitlines():
-        if "nvidia-driver-setup" in line and "(" in line:
-            latest = line.split("(")[1].split(")")[0].strip()
-            if latest != current_version:
-                return True, f"Current: {current_version} -> Available: {latest}"
-            return False, f"Already at latest version ({current_version})."
+    if _is_newer(latest, current_version):
+        return True, f"Current: {current_version} -> Available: {latest}"
+    if latest != current_version:
+        return False, f"Local version {current_version} is newer than PyPI ({latest})."
+    return False, f"Already at latest version ({current_version})."
 
-    return False, "Could not determine latest version."
 
+# Install method -> update check; methods without one cannot self-update
+_UPDATE_CHECKS = {
+    InstallMethod.GIT_CLONE: _check_git_updates,
+    InstallMethod.PIP: _check_pip_updates,
+}
 
+
+def prefetch_update_check() -> None:
+    """Start the update check in a background thread.
+
+    run_self_update() picks up the result, so the network round trip
+    overlaps with whatever runs in between.  Does nothing if a check is
+    already pending or the install method cannot be updated.
+    """
+    global _pending_check
+    if _pending_check is not None:
+        return
+    check = _UPDATE_CHECKS.get(detect_install_method())
+    if check is None:
+        return
+    executor = ThreadPoolExecutor(max_workers=1)
+    _pending_check = executor.submit(check)
+    executor.shutdown(wait=False)
+
+
+@functools.lru_cache(maxsize=1)
 def _needs_break_system_packages() -> bool:
     """Check if pip requires --break-system-packages (PEP 668, Ubuntu 24.04+).
 
     PEP 668 marks system Python as externally managed via a marker file
     in the stdlib directory.  When present, pip refuses to install
-    system-wide without the --break-system-packages flag.
+    system-wide without the --break-system-packages flag.  The marker
+    does not apply inside a virtual environment.
     """
+    if sys.prefix != sys.base_prefix:
+        return False
     stdlib = Path(sys.prefix) / "lib" / f"python{sys.version_info.major}.{sys.version_info.minor}" / "EXTERNALLY-MANAGED"
     return stdlib.is_file()
 
@@ -134,21 +282,32 @@ def _perform_git_update() -> bool:
     project_root = _get_project_root()
     cwd = str(project_root)
 
+    _ensure_origin(cwd)
+
     log_info("Pulling latest changes...")
-    result = subprocess.run(
-        ["git", "pull", "origin", "main"],
-        cwd=cwd, capture_output=True, text=True,
-    )
-    if result.returncode != 0:
-        log_error(f"git pull failed: {result.stderr.strip()}")
-        return False
-    log_info(result.stdout.strip())
+    if (project_root / ".git" / "shallow").is_file():
+        # Shallow clone: fetch only the new tip instead of the full history.
+        # A depth-1 tip shares no history with HEAD, so it cannot be merged;
+        # move to it with reset --keep, which refuses to drop local edits.
+        git_cmds = [
+            ["git", "fetch", "--depth=1", "origin", "main"],
+            ["git", "reset", "--keep", "FETCH_HEAD"],
+        ]
+    else:
+        git_cmds = [["git", "pull", "origin", "main"]]
+    for git_cmd in git_cmds:
+        # git's stdout goes straight to the terminal; stderr is kept for errors
+        result = subprocess.run(git_cmd, cwd=cwd, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            log_error(f"git {git_cmd[1]} failed: {result.stderr.strip()}")
+            return False
 
     log_info("Reinstalling package...")
     pip_cmd = [sys.executable, "-m", "pip", "install", "-e", "."]
     if _needs_break_system_packages():
         pip_cmd.insert(4, "--break-system-packages")
-    result = subprocess.run(pip_cmd, cwd=cwd, capture_output=True, text=True)
+    # pip's progress goes straight to the terminal; only stderr is kept
+    result = subprocess.run(pip_cmd, cwd=cwd, stderr=subprocess.PIPE, text=True)
     if result.returncode != 0:
         log_error(f"pip install failed: {result.stderr.strip()}")
         return False
@@ -166,7 +325,7 @@ def _perform_pip_update() -> bool:
     pip_cmd = [sys.executable, "-m", "pip", "install", "--upgrade", "nvidia-driver-setup"]
     if _needs_break_system_packages():
         pip_cmd.insert(4, "--break-system-packages")
-    result = subprocess.run(pip_cmd, capture_output=True, text=True)
+    result = subprocess.run(pip_cmd, stderr=subprocess.PIPE, text=True)
     if result.returncode != 0:
         log_error(f"pip upgrade failed: {result.stderr.strip()}")
         return False
@@ -178,17 +337,19 @@ def run_self_update() -> None:
     """Public entry point: detect method, check for updates, confirm, update."""
     log_step("Self-Update Check")
 
+    global _pending_check
     method = detect_install_method()
+    # Start the check before logging (no-op if the CLI already started it)
+    prefetch_update_check()
     log_info(f"Install method: {method.value}")
 
-    if method == InstallMethod.GIT_CLONE:
-        has_updates, summary = _check_git_updates()
-    elif method == InstallMethod.PIP:
-        has_updates, summary = _check_pip_updates()
-    else:
+    if _pending_check is None:
         log_warn("Cannot determine install method. Update manually.")
         return
 
+    future, _pending_check = _pending_check, None
+    has_updates, summary = future.result()
+
     log_info(summary)
 
     if not has_updates:
@@ -219,20 +380,13 @@ def _restart_process() -> None:
     executable = sys.executable
     args = sys.argv[:]
 
-    # Determine how we were launched to pick the right re-exec strategy
-    method = detect_install_method()
-
-    # Check if launched via an installed console_scripts entry point (nvidia-setup)
-    script_path = subprocess.run(
-        ["which", "nvidia-setup"],
-        capture_output=True, text=True,
-    )
-    if script_path.returncode == 0 and script_path.stdout.strip():
-        # Re-exec the installed command directly
-        cmd = script_path.stdout.strip()
-        log_info(f"Restarting: {cmd}")
-        os.execv(cmd, [cmd] + args[1:])
+    # Re-exec the installed console_scripts entry point (nvidia-setup);
+    # execvp searches PATH itself and raises if it is not installed
+    try:
+        os.execvp("nvidia-setup", ["nvidia-setup"] + args[1:])
+    except OSError:
+        pass
 
     # Fallback: re-exec via python3 -m nvidia_driver_setup
-    log_info(f"Restarting: {executable} -m nvidia_driver_setup")
+    log_info(f"nvidia-setup not on PATH, restarting via {executable} -m nvidia_driver_setup")
     os.execv(executable, [executable, "-m", "nvidia_driver_setup"] + args[1:])
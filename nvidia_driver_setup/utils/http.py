@@ -0,0 +1,88 @@
+"""Minimal HTTP(S) GET helper built on the standard library.
+
+Shared by the Vulkan SDK installer, the NvFBC script download and the
+self-updater.  Unlike urllib.request it yields 304 responses instead of
+raising, so callers can revalidate cached files with ETags, and it
+refuses redirects that would downgrade https to plain http.
+"""
+
+import contextlib
+import http.client
+from typing import Iterator, Optional
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = "nvidia-driver-setup/1.0"
+DEFAULT_TIMEOUT = 15
+
+_MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+
+
+def _connect(scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+    """Create a new (not yet connected) connection."""
+    if scheme == "https":
+        return http.client.HTTPSConnection(host, port, timeout=timeout)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+@contextlib.contextmanager
+def http_get(
+    url: str,
+    headers: Optional[dict[str, str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Iterator[http.client.HTTPResponse]:
+    """GET ``url``, following redirects.
+
+    Yields the final response, which supports ``read()`` and can be
+    passed to ``json.load`` or ``shutil.copyfileobj``.  The connection is
+    closed on exit.
+
+    Args:
+        url: Absolute http:// or https:// URL.
+        headers: Extra request headers (User-Agent is added by default).
+        timeout: Socket timeout in seconds for connect and each read.
+
+    Raises:
+        OSError: On connection failure, too many redirects, a redirect
+            from https to a non-https URL, or an HTTP status >= 400.
+            A 304 response is yielded, not raised.
+    """
+    req_headers = {"User-Agent": USER_AGENT}
+    if headers:
+        req_headers.update(headers)
+
+    for _ in range(_MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise OSError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        conn = _connect(parts.scheme, parts.hostname, port, timeout)
+        try:
+            try:
+                conn.request("GET", path, headers=req_headers)
+                resp = conn.getresponse()
+            except http.client.HTTPException as exc:
+                raise OSError(f"HTTP error: {exc}") from exc
+
+            if resp.status in _REDIRECT_STATUSES:
+                location = resp.getheader("Location")
+                if not location:
+                    raise OSError(f"HTTP {resp.status} without Location for {url}")
+                target = urljoin(url, location)
+                # Never let a redirect drop TLS; checksums fetched over it would be void
+                if parts.scheme == "https" and urlsplit(target).scheme != "https":
+                    raise OSError(f"Refusing insecure redirect from {url} to {target}")
+                url = target
+                continue
+
+            if resp.status >= 400:
+                raise OSError(f"HTTP {resp.status} {resp.reason} for {url}")
+
+            yield resp
+            return
+        finally:
+            conn.close()
+
+    raise OSError(f"Too many redirects for {url}")
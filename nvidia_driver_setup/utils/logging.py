@@ -1,5 +1,7 @@
 """Logging utilities for NVIDIA Driver Setup"""
 
+import sys
+
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -12,31 +14,49 @@ class Colors:
     CYAN = '\033[1;36m'
 
 
+# Prefixes are built once; piped output carries no escape codes
+_USE_COLOR = sys.stdout is not None and sys.stdout.isatty()
+
+
+def _color(*codes):
+    return "".join(codes) if _USE_COLOR else ""
+
+
+_RESET = _color(Colors.RESET)
+_INFO_PREFIX = _color(Colors.GREEN) + "[INFO]  "
+_WARN_PREFIX = _color(Colors.YELLOW) + "[WARN]  "
+_ERROR_PREFIX = _color(Colors.RED) + "[ERROR] "
+_PROMPT_PREFIX = _color(Colors.CYAN) + "[INPUT] "
+_STEP_PREFIX = "\n" + _color(Colors.BLUE) + "[STEP]  "
+_SUCCESS_PREFIX = _color(Colors.BOLD, Colors.GREEN) + "✓ "
+
+
 def log_info(message):
     """Log info message in green"""
-    print(f"{Colors.GREEN}[INFO]  {message}{Colors.RESET}")
+    print(f"{_INFO_PREFIX}{message}{_RESET}")
 
 
 def log_warn(message):
     """Log warning message in yellow"""
-    print(f"{Colors.YELLOW}[WARN]  {message}{Colors.RESET}")
+    print(f"{_WARN_PREFIX}{message}{_RESET}")
 
 
 def log_error(message):
     """Log error message in red"""
-    print(f"{Colors.RED}[ERROR] {message}{Colors.RESET}")
+    print(f"{_ERROR_PREFIX}{message}{_RESET}")
 
 
 def log_prompt(message):
-    """Log prompt message in cyan"""
-    print(f"{Colors.CYAN}[INPUT] {message}{Colors.RESET}", end='')
+    """Log prompt message in cyan (flushed, since no newline follows)"""
+    sys.stdout.write(f"{_PROMPT_PREFIX}{message}{_RESET}")
+    sys.stdout.flush()
 
 
 def log_step(message):
     """Log step message in blue with newline before"""
-    print(f"\n{Colors.BLUE}[STEP]  {message}{Colors.RESET}")
+    print(f"{_STEP_PREFIX}{message}{_RESET}")
 
 
 def log_success(message):
     """Log success message in bold green"""
-    print(f"{Colors.BOLD}{Colors.GREEN}✓ {message}{Colors.RESET}")
\ No newline at end of file
+    print(f"{_SUCCESS_PREFIX}{message}{_RESET}")
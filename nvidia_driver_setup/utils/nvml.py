@@ -0,0 +1,137 @@
+"""Minimal NVML bindings via ctypes.
+
+Queries the driver through libnvidia-ml.so.1 in-process instead of
+forking nvidia-smi.  The library is loaded lazily; if it cannot be
+loaded the query functions return None so callers can fall back to
+nvidia-smi.  NVML is initialised and shut down around every query so a
+driver installed (or upgraded) mid-run is picked up on the next call.
+"""
+
+import ctypes
+import threading
+from typing import NamedTuple, Optional
+
+_NVML_LIB = "libnvidia-ml.so.1"
+
+NVML_SUCCESS = 0
+NVML_ERROR_NOT_SUPPORTED = 3
+NVML_ERROR_DRIVER_NOT_LOADED = 9
+NVML_ERROR_LIB_RM_VERSION_MISMATCH = 18
+
+_NVML_ENCODER_QUERY_H264 = 0
+_DRIVER_VERSION_BUFFER_SIZE = 80
+_DEVICE_NAME_BUFFER_SIZE = 96
+
+_lib: Optional[ctypes.CDLL] = None
+_lib_lock = threading.Lock()
+
+
+class NvmlError(Exception):
+    """An NVML call returned a non-success status."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class GpuInfo(NamedTuple):
+    """Properties of one NVIDIA GPU as reported by NVML."""
+
+    name: str
+    driver_version: str
+    compute_capability: str
+    has_encoder: bool
+    has_decoder: bool
+
+
+def _load() -> Optional[ctypes.CDLL]:
+    """dlopen libnvidia-ml once it is available; failures are not cached."""
+    global _lib
+    with _lib_lock:
+        if _lib is None:
+            try:
+                lib = ctypes.CDLL(_NVML_LIB)
+            except OSError:
+                return None
+            lib.nvmlErrorString.restype = ctypes.c_char_p
+            _lib = lib
+        return _lib
+
+
+def _check(lib: ctypes.CDLL, code: int) -> None:
+    if code != NVML_SUCCESS:
+        message = lib.nvmlErrorString(code)
+        raise NvmlError(code, message.decode() if message else f"NVML error {code}")
+
+
+def _driver_version(lib: ctypes.CDLL) -> str:
+    buf = ctypes.create_string_buffer(_DRIVER_VERSION_BUFFER_SIZE)
+    _check(lib, lib.nvmlSystemGetDriverVersion(buf, ctypes.c_uint(len(buf))))
+    return buf.value.decode()
+
+
+def get_driver_version() -> Optional[str]:
+    """Return the loaded kernel driver version (e.g. "570.133.07").
+
+    Returns:
+        The version string, or None if libnvidia-ml is not installed.
+
+    Raises:
+        NvmlError: If NVML is present but cannot initialise, e.g. with
+            ``NVML_ERROR_LIB_RM_VERSION_MISMATCH`` before a reboot.
+    """
+    lib = _load()
+    if lib is None:
+        return None
+    _check(lib, lib.nvmlInit_v2())
+    try:
+        return _driver_version(lib)
+    finally:
+        lib.nvmlShutdown()
+
+
+def query_gpu(index: int = 0) -> Optional[GpuInfo]:
+    """Return name, driver, compute capability and codec support of a GPU.
+
+    Args:
+        index: NVML device index.
+
+    Returns:
+        A :class:`GpuInfo`, or None if libnvidia-ml is not installed.
+
+    Raises:
+        NvmlError: If NVML is present but initialisation or a device
+            query fails.
+    """
+    lib = _load()
+    if lib is None:
+        return None
+    _check(lib, lib.nvmlInit_v2())
+    try:
+        device = ctypes.c_void_p()
+        _check(lib, lib.nvmlDeviceGetHandleByIndex_v2(ctypes.c_uint(index), ctypes.byref(device)))
+
+        name = ctypes.create_string_buffer(_DEVICE_NAME_BUFFER_SIZE)
+        _check(lib, lib.nvmlDeviceGetName(device, name, ctypes.c_uint(len(name))))
+
+        major, minor = ctypes.c_int(), ctypes.c_int()
+        _check(lib, lib.nvmlDeviceGetCudaComputeCapability(
+            device, ctypes.byref(major), ctypes.byref(minor)))
+
+        # Both calls report NOT_SUPPORTED on GPUs without the engine
+        capacity = ctypes.c_uint()
+        has_encoder = lib.nvmlDeviceGetEncoderCapability(
+            device, _NVML_ENCODER_QUERY_H264, ctypes.byref(capacity)) == NVML_SUCCESS
+        util, period = ctypes.c_uint(), ctypes.c_uint()
+        has_decoder = lib.nvmlDeviceGetDecoderUtilization(
+            device, ctypes.byref(util), ctypes.byref(period)) == NVML_SUCCESS
+
+        return GpuInfo(
+            name=name.value.decode(),
+            driver_version=_driver_version(lib),
+            compute_capability=f"{major.value}.{minor.value}",
+            has_encoder=has_encoder,
+            has_decoder=has_decoder,
+        )
+    finally:
+        lib.nvmlShutdown()
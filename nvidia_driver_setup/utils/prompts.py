@@ -5,6 +5,9 @@ import termios
 
 from .logging import log_prompt, log_error, log_info
 
+_YES_ANSWERS = frozenset(('y', 'yes'))
+_NO_ANSWERS = frozenset(('n', 'no'))
+
 
 def _flush_stdin() -> None:
     """Discard any buffered input on stdin (prevents stale keypresses)."""
@@ -28,12 +31,11 @@ def prompt_yes_no(prompt, default='y'):
     _flush_stdin()
     while True:
         log_prompt(f"{prompt} [Y/n]: ")
-        response = input().strip()
-        response = response or default
+        response = input().strip().lower() or default
 
-        if response.lower() in ['y', 'yes']:
+        if response in _YES_ANSWERS:
             return True
-        elif response.lower() in ['n', 'no']:
+        elif response in _NO_ANSWERS:
             return False
         else:
             log_error("Please answer yes or no.")
@@ -137,11 +139,20 @@ def _curses_multi_select(
     import curses
 
     selected: set[int] = set(pre_selected) if pre_selected else set()
+    all_indices = frozenset(range(len(options)))
     cursor = 0  # 0 = Exit, 1..N = options
     total_items = len(options) + 1  # +1 for Exit row
 
+    # The label and description of each row never change between frames;
+    # only the cursor prefix and selection marker are added per draw
+    item_labels = [
+        f"{idx + 1}. {opt} {status}" if status else f"{idx + 1}. {opt}"
+        for idx, (opt, status) in enumerate(zip(options, statuses))
+    ]
+    desc_lines = [f"       {desc}" for desc in descriptions]
+
     def _draw(stdscr: "curses.window") -> list[int]:
-        nonlocal cursor, selected
+        nonlocal cursor
         curses.curs_set(0)
         curses.start_color()
         curses.use_default_colors()
@@ -151,12 +162,16 @@ def _curses_multi_select(
         curses.init_pair(4, curses.COLOR_WHITE, -1)     # normal
         curses.init_pair(5, curses.COLOR_RED, -1)       # not installed
 
+        # Rows drawn in the previous frame; only rows whose text or attribute
+        # changed are rewritten, so a cursor move repaints two rows
+        prev: dict[int, tuple[str, int]] = {}
+        stdscr.erase()
+
         while True:
-            stdscr.clear()
             max_y, max_x = stdscr.getmaxyx()
 
             # Header
-            stdscr.addnstr(0, 0, prompt, max_x - 1, curses.A_BOLD)
+            frame: dict[int, tuple[str, int]] = {0: (prompt, curses.A_BOLD)}
 
             row = 2
             # Exit option
@@ -164,21 +179,19 @@ def _curses_multi_select(
             attr = curses.color_pair(1) | curses.A_BOLD if cursor == 0 else curses.color_pair(4)
             exit_text = f"{prefix}0. {exit_label}"
             if row < max_y:
-                stdscr.addnstr(row, 0, exit_text, max_x - 1, attr)
+                frame[row] = (exit_text, attr)
             row += 1
 
             # Menu items
-            for idx, (opt, desc, status) in enumerate(zip(options, descriptions, statuses)):
+            for idx, (label, desc_line) in enumerate(zip(item_labels, desc_lines)):
                 if row + 1 >= max_y:
                     break
                 is_cursor = (cursor == idx + 1)
-                marker = "*" if idx in selected else " "
 
                 # Build the line
                 prefix = " > " if is_cursor else "   "
-                line = f"{prefix}[{marker}] {idx + 1}. {opt}"
-                if status:
-                    line += f" {status}"
+                marker = "[*] " if idx in selected else "[ ] "
+                line = prefix + marker + label
 
                 if is_cursor:
                     attr = curses.color_pair(1) | curses.A_BOLD
@@ -187,14 +200,13 @@ def _curses_multi_select(
                 else:
                     attr = curses.color_pair(4)
 
-                stdscr.addnstr(row, 0, line, max_x - 1, attr)
+                frame[row] = (line, attr)
                 row += 1
 
                 # Description line
-                desc_line = f"       {desc}"
                 desc_attr = curses.color_pair(1) if is_cursor else curses.color_pair(4) | curses.A_DIM
                 if row < max_y:
-                    stdscr.addnstr(row, 0, desc_line, max_x - 1, desc_attr)
+                    frame[row] = (desc_line, desc_attr)
                 row += 1
 
             # Footer
@@ -202,40 +214,63 @@ def _curses_multi_select(
             count = len(selected)
             if row < max_y:
                 footer = f" {count} selected  |  Space: toggle  a: all  Enter: run  q: exit"
-                stdscr.addnstr(row, 0, footer, max_x - 1, curses.color_pair(3))
-
-            stdscr.refresh()
-
-            # Input
-            key = stdscr.getch()
-
-            if key == curses.KEY_UP or key == ord('k'):
-                cursor = (cursor - 1) % total_items
-            elif key == curses.KEY_DOWN or key == ord('j'):
-                cursor = (cursor + 1) % total_items
-            elif key == ord(' '):
-                if cursor == 0:
-                    # Space on Exit = exit
-                    return []
-                idx = cursor - 1
-                if idx in selected:
-                    selected.discard(idx)
-                else:
-                    selected.add(idx)
-            elif key == ord('a'):
-                if len(selected) == len(options):
-                    selected.clear()
-                else:
-                    selected = set(range(len(options)))
-            elif key in (curses.KEY_ENTER, 10, 13):
-                if cursor == 0:
+                frame[row] = (footer, curses.color_pair(3))
+
+            for r in prev.keys() - frame.keys():
+                stdscr.move(r, 0)
+                stdscr.clrtoeol()
+            for r, (text, attr) in frame.items():
+                if prev.get(r) != (text, attr):
+                    stdscr.move(r, 0)
+                    stdscr.clrtoeol()
+                    stdscr.addnstr(r, 0, text, max_x - 1, attr)
+            prev = frame
+
+            stdscr.noutrefresh()
+            curses.doupdate()
+
+            # Input: block for one key, then drain whatever else is already
+            # queued (e.g. key autorepeat) so a burst costs a single redraw
+            keys = [stdscr.getch()]
+            stdscr.nodelay(True)
+            try:
+                while (key := stdscr.getch()) != -1:
+                    keys.append(key)
+            finally:
+                stdscr.nodelay(False)
+
+            for key in keys:
+                if key == curses.KEY_RESIZE:
+                    # Terminal geometry changed: repaint everything
+                    stdscr.erase()
+                    prev = {}
+                elif key == curses.KEY_UP or key == ord('k'):
+                    cursor = (cursor - 1) % total_items
+                elif key == curses.KEY_DOWN or key == ord('j'):
+                    cursor = (cursor + 1) % total_items
+                elif key == ord(' '):
+                    if cursor == 0:
+                        # Space on Exit = exit
+                        return []
+                    idx = cursor - 1
+                    if idx in selected:
+                        selected.discard(idx)
+                    else:
+                        selected.add(idx)
+                elif key == ord('a'):
+                    if len(selected) == len(all_indices):
+                        selected.clear()
+                    else:
+                        selected.update(all_indices)
+                elif key in (curses.KEY_ENTER, 10, 13):
+                    if cursor == 0:
+                        return []
+                    if not selected:
+                        # Nothing selected, don't proceed
+                        continue
+                    return sorted(selected)
+                elif key in (ord('q'), 27):  # q or Esc
                     return []
-                if not selected:
-                    # Nothing selected, don't proceed
-                    continue
-                return sorted(selected)
-            elif key in (ord('q'), 27):  # q or Esc
-                return []
 
     return curses.wrapper(_draw)
 
@@ -250,17 +285,20 @@ def _fallback_multi_select(
 ) -> list[int]:
     """Number-based fallback multi-select for terminals without curses."""
     selected: set[int] = set(pre_selected) if pre_selected else set()
+    num_options = len(options)
+    all_indices = frozenset(range(num_options))
 
     def _render() -> None:
-        print(f"\n{prompt}")
-        print(f"  0. {exit_label}")
+        # Build the whole menu and write it at once rather than line by line
+        lines = [f"\n{prompt}", f"  0. {exit_label}"]
         for idx, (opt, desc, status) in enumerate(zip(options, descriptions, statuses)):
             marker = "*" if idx in selected else " "
             status_tag = f" {status}" if status else ""
-            print(f"  [{marker}] {idx + 1}. {opt}{status_tag}")
-            print(f"          {desc}")
+            lines.append(f"  [{marker}] {idx + 1}. {opt}{status_tag}")
+            lines.append(f"          {desc}")
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
         count = len(selected)
-        print()
         log_info(f"{count} item(s) selected.  "
                  "Enter numbers to toggle | 'a' = toggle all | Enter = run selected | 0 = exit")
 
@@ -279,34 +317,34 @@ def _fallback_multi_select(
             return []
 
         if raw.lower() == "a":
-            if len(selected) == len(options):
+            if len(selected) == num_options:
                 selected.clear()
             else:
-                selected = set(range(len(options)))
+                selected.update(all_indices)
             continue
 
-        tokens = raw.replace(",", " ").split()
-        valid = True
-        for token in tokens:
+        # Validate every token before toggling anything
+        nums = []
+        for token in raw.replace(",", " ").split():
             try:
                 num = int(token)
             except ValueError:
                 log_error(f"Invalid input: '{token}'")
-                valid = False
                 break
-            if num == 0:
-                return []
-            if num < 1 or num > len(options):
-                log_error(f"Out of range: {num} (valid: 1-{len(options)})")
-                valid = False
+            if num < 0 or num > num_options:
+                log_error(f"Out of range: {num} (valid: 1-{num_options})")
                 break
-            idx = num - 1
-            if idx in selected:
-                selected.discard(idx)
-            else:
-                selected.add(idx)
-        if not valid:
-            continue
+            nums.append(num)
+        else:
+            if 0 in nums:
+                return []
+            # Toggle once per token, so a repeated number cancels out
+            for num in nums:
+                idx = num - 1
+                if idx in selected:
+                    selected.discard(idx)
+                else:
+                    selected.add(idx)
 
 
 def prompt_multi_select(
@@ -1,13 +1,17 @@
 """System utilities for command execution and package management"""
 
+import functools
+import glob
+import platform
 import re
 import subprocess
 import os
+import tempfile
 from datetime import datetime
 from .logging import log_info, log_error, log_warn, log_step, log_success
 
 
-def run_command(cmd, shell=True, check=True, capture_output=False):
+def run_command(cmd, shell=True, check=True, capture_output=False, timeout=None):
     """
     Execute a system command with logging
     
@@ -16,6 +20,9 @@ def run_command(cmd, shell=True, check=True, capture_output=False):
         shell: Whether to use shell
         check: Whether to raise exception on failure
         capture_output: Whether to capture and return output
+        timeout: Seconds before the command is killed (None waits forever).
+            Use list commands with shell=False so the kill reaches the
+            program itself rather than only the shell.
     
     Returns:
         CompletedProcess object or output string if capture_output=True
@@ -26,17 +33,22 @@ def run_command(cmd, shell=True, check=True, capture_output=False):
         if capture_output:
             result = subprocess.run(cmd, shell=shell, check=check,
                                   capture_output=True, text=True,
-                                  stdin=subprocess.DEVNULL)
+                                  stdin=subprocess.DEVNULL, timeout=timeout)
             return result.stdout.strip()
         else:
             result = subprocess.run(cmd, shell=shell, check=check,
-                                  stdin=subprocess.DEVNULL)
+                                  stdin=subprocess.DEVNULL, timeout=timeout)
             return result
     except subprocess.CalledProcessError as e:
         log_error(f"Command failed: {cmd}")
         if check:
             raise
         return None
+    except subprocess.TimeoutExpired:
+        log_warn(f"Command timed out after {timeout}s: {cmd}")
+        if check:
+            raise
+        return None
 
 
 class AptManager:
@@ -59,6 +71,23 @@ class AptManager:
         """
         cls._update_done = False
 
+    def installed(self, *packages) -> set[str]:
+        """Return which of ``packages`` are fully installed.
+
+        Uses one ``dpkg-query`` call for the whole list; unknown packages
+        are simply absent from the result.
+        """
+        output = run_command(
+            ["dpkg-query", "-W", "-f=${Package}\t${Status}\n", *packages],
+            shell=False, capture_output=True, check=False,
+        )
+        installed: set[str] = set()
+        for line in (output or "").splitlines():
+            name, _, status = line.partition("\t")
+            if status == "install ok installed":
+                installed.add(name)
+        return installed
+
     def install(self, *packages):
         """Install packages using apt"""
         self.update()
@@ -958,13 +987,98 @@ def full_nvidia_cleanup(dry_run: bool = True) -> bool:
     return found_issues
 
 
+_PCI_DEVICES_DIR = "/sys/bus/pci/devices"
+_PCI_IDS_PATHS = ("/usr/share/misc/pci.ids", "/usr/share/hwdata/pci.ids")
+# PCI base class 0x03 = display controller (VGA, XGA, 3D, other)
+_PCI_DISPLAY_CLASS_PREFIX = "0x03"
+PCI_VENDOR_IDS = {
+    "10de": "nvidia",
+    "8086": "intel",
+    "1002": "amd",
+}
+
+
+def _read_sysfs_attr(device_dir: str, attr: str) -> str:
+    with open(os.path.join(device_dir, attr), "r") as fh:
+        return fh.read().strip()
+
+
+def scan_pci_display_devices() -> list[tuple[str, str]] | None:
+    """List display controllers by reading sysfs directly (no lspci fork).
+
+    Returns:
+        ``(vendor_id, device_id)`` pairs as 4-digit lower-case hex (e.g.
+        ``("10de", "2204")``) in PCI slot order, or None when
+        ``/sys/bus/pci`` is unavailable and callers should use lspci.
+    """
+    try:
+        slots = sorted(os.listdir(_PCI_DEVICES_DIR))
+    except OSError:
+        return None
+
+    devices: list[tuple[str, str]] = []
+    for slot in slots:
+        device_dir = os.path.join(_PCI_DEVICES_DIR, slot)
+        try:
+            if not _read_sysfs_attr(device_dir, "class").startswith(_PCI_DISPLAY_CLASS_PREFIX):
+                continue
+            vendor_id = _read_sysfs_attr(device_dir, "vendor")[2:].lower()
+            device_id = _read_sysfs_attr(device_dir, "device")[2:].lower()
+        except OSError:
+            continue
+        devices.append((vendor_id, device_id))
+    return devices
+
+
+@functools.lru_cache(maxsize=None)
+def pci_device_name(vendor_id: str, device_id: str) -> str | None:
+    """Resolve a PCI device ID to its name using the system pci.ids database.
+
+    Args:
+        vendor_id: 4-digit lower-case hex vendor ID.
+        device_id: 4-digit lower-case hex device ID.
+
+    Returns:
+        The device name (e.g. "GA102 [GeForce RTX 3090]"), or None if
+        pci.ids is missing or does not list the device.
+    """
+    for path in _PCI_IDS_PATHS:
+        try:
+            fh = open(path, "r", encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        with fh:
+            in_vendor = False
+            for line in fh:
+                if not line.strip() or line.startswith(("#", "\t\t")):
+                    continue
+                if line.startswith("\t"):
+                    if in_vendor and line[1:5] == device_id:
+                        return line[5:].strip()
+                elif in_vendor:
+                    return None  # left the vendor's block
+                elif line[:4] == vendor_id:
+                    in_vendor = True
+        return None
+    return None
+
+
+@functools.lru_cache(maxsize=1)
 def detect_gpu_vendors() -> list[str]:
-    """Detect GPU vendors present in the system via lspci.
+    """Detect GPU vendors present in the system via sysfs (lspci fallback).
+
+    PCI devices do not change while the tool runs, so the scan is done
+    once per process; callers must not mutate the returned list.
 
     Returns:
         List of vendor identifiers found: 'nvidia', 'intel', 'amd'.
         May contain multiple entries on systems with both dGPU and iGPU.
     """
+    devices = scan_pci_display_devices()
+    if devices is not None:
+        found = {PCI_VENDOR_IDS.get(vendor_id) for vendor_id, _ in devices}
+        return [v for v in ("nvidia", "intel", "amd") if v in found]
+
     vendors: list[str] = []
     try:
         result = subprocess.run(
@@ -984,6 +1098,64 @@ def detect_gpu_vendors() -> list[str]:
     return vendors
 
 
+def get_cache_dir(*parts: str) -> str:
+    """Return (and create) a directory under the tool's cache root.
+
+    The cache root is ``$XDG_CACHE_HOME/nvidia-driver-setup``, falling
+    back to ``~/.cache/nvidia-driver-setup``.
+
+    Args:
+        parts: Optional subdirectory components below the cache root.
+
+    Returns:
+        Absolute path of the cache directory.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "nvidia-driver-setup", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_file_if_changed(path: str, content: str, mode: int = 0o644) -> bool:
+    """Atomically write ``content`` to ``path`` unless it already matches.
+
+    The new content goes to a temp file in the same directory which is
+    then renamed over ``path``, so readers never see a partial file.
+
+    Args:
+        path: Destination file.
+        content: Full text to write.
+        mode: Permission bits for the written file.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+
+    Raises:
+        OSError: If the file could not be written.
+    """
+    try:
+        with open(path, "r") as fh:
+            if fh.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                    prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
+
+
 def check_internet():
     """Check internet connectivity"""
     try:
@@ -993,8 +1165,9 @@ def check_internet():
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def get_os_info():
-    """Get OS information from /etc/os-release"""
+    """Get OS information from /etc/os-release (read once per process)"""
     try:
         with open('/etc/os-release', 'r') as f:
             lines = f.readlines()
@@ -1010,8 +1183,32 @@ def get_os_info():
         return {}
 
 
+_DPKG_INFO_DIR = "/var/lib/dpkg/info"
+
+
+def dpkg_has_file_list(package: str) -> bool:
+    """Return True if dpkg keeps a file list for ``package``.
+
+    Every unpacked package has ``<name>.list`` (or ``<name>:<arch>.list``
+    for multiarch packages) under /var/lib/dpkg/info, so this is a cheap
+    check before forking dpkg-query for a package that is usually absent.
+    """
+    base = os.path.join(_DPKG_INFO_DIR, package)
+    return os.path.exists(base + ".list") or bool(glob.glob(glob.escape(base) + ":*.list"))
+
+
+@functools.lru_cache(maxsize=1)
+def get_kernel_release() -> str:
+    """Return the running kernel release (``uname -r``) without forking."""
+    return platform.release()
+
+
+@functools.lru_cache(maxsize=1)
 def check_nvidia_gpu():
-    """Check if NVIDIA GPU is present"""
+    """Check if NVIDIA GPU is present (PCI devices are probed once per process)"""
+    devices = scan_pci_display_devices()
+    if devices is not None:
+        return any(vendor_id == "10de" for vendor_id, _ in devices)
     try:
         output = run_command("lspci | grep -i nvidia", capture_output=True, check=False)
         return bool(output)
@@ -1046,11 +1243,8 @@ def write_egl_icd_default() -> None:
     # Also check via ldconfig if not found on disk
     if not egl_found:
         try:
-            result = subprocess.run(
-                "ldconfig -p | grep libEGL_nvidia.so.0",
-                shell=True, capture_output=True, text=True,
-            )
-            if result.returncode == 0 and "libEGL_nvidia" in result.stdout:
+            result = subprocess.run(["ldconfig", "-p"], capture_output=True)
+            if result.returncode == 0 and b"libEGL_nvidia.so.0" in result.stdout:
                 egl_found = True
         except OSError:
             pass
@@ -1096,8 +1290,7 @@ def write_egl_icd_default() -> None:
 
     try:
         os.makedirs(icd_dir, exist_ok=True)
-        with open(icd_path, "w") as fh:
-            fh.write(icd_content)
-        log_info(f"Wrote default NVIDIA EGL ICD: {icd_path} (api_version {api_version})")
+        if write_file_if_changed(icd_path, icd_content):
+            log_info(f"Wrote default NVIDIA EGL ICD: {icd_path} (api_version {api_version})")
     except OSError as exc:
         log_warn(f"Could not write {icd_path}: {exc}")
\ No newline at end of file